@@ -6,6 +6,7 @@ This script adds Firebase authentication to your existing static HTML files
 
 import os
 import re
+import shutil
 from pathlib import Path
 
 def add_auth_to_html(html_content, site_name):
@@ -166,17 +167,14 @@ def create_auth_files(docs_dir):
         source_path = Path(auth_file)
         dest_path = docs_path / auth_file
         
-        if source_path.exists():
+        try:
             # Copy the file
-            with open(source_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            with open(dest_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            print(f"✅ Copied {auth_file} to docs directory")
-        else:
+            shutil.copyfile(source_path, dest_path)
+        except FileNotFoundError:
             print(f"❌ Source file {auth_file} not found")
+            continue
+        
+        print(f"✅ Copied {auth_file} to docs directory")
 
 def main():
     """Main function"""
@@ -343,6 +343,11 @@ class FestivalCrawler:
                 with open(mapping_file, 'w') as f:
                     json.dump(self.url_mapping, f, indent=2)
                 
+                # Save the reverse mapping in the direction the site generator reads it
+                reverse_mapping_file = self.output_dir / 'filename_to_url.json'
+                with open(reverse_mapping_file, 'w') as f:
+                    json.dump(dict(zip(self.url_mapping.values(), self.url_mapping.keys())), f, indent=2)
+                
                 # Save sitemap
                 sitemap_file = self.output_dir / 'sitemap.json'
                 hierarchical_sitemap = self.build_hierarchical_sitemap()
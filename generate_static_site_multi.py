@@ -6,13 +6,26 @@ Outputs to docs/ directory for GitHub Pages deployment
 """
 
 import os
+import sys
 import csv
-import json
-import base64
+import functools
+import gzip
+import hashlib
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from collections import defaultdict
-from PIL import Image
-import io
+import numpy as np
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+try:
+    import orjson as _json
+except ImportError:
+    # orjson not installed - stdlib json parses the same payloads
+    import json as _json
+try:
+    import brotli
+except ImportError:
+    # brotli not installed - only .gz copies are precompressed
+    brotli = None
 
 # Site configurations
 SITE_CONFIGS = {
@@ -37,26 +50,47 @@ SITE_CONFIGS = {
 }
 
 # Configuration
-THUMBNAIL_SIZE = (300, 225)
 MAX_IMAGES_PER_CLUSTER = 4
+EAGER_CARDS = 6  # cards likely above the fold; their canonical images skip lazy loading
+INITIAL_CARDS = 24  # cards rendered into the index HTML; the rest are built client-side from the manifest
 OUTPUT_DIR = Path("docs")
+CACHE_DIR = Path(".cache")  # build caches stay outside the published docs/ tree
 SPACES_CDN_BASE = "https://quotient.nyc3.cdn.digitaloceanspaces.com"
+CDN_PREFIXES = {site: f"{SPACES_CDN_BASE}/{site}/" for site in SITE_CONFIGS}  # image URL prefix per site
+WRITE_BUFFER_SIZE = 1 << 20  # pages are streamed to disk through a 1 MiB buffer
+EMIT_GZIP = os.environ.get('EMIT_GZIP', '1') != '0'  # EMIT_GZIP=0 skips .gz/.br copies for quick local builds
 
+# Single-pass translation table for filenames in single-quoted JS strings (the templates' autoescape adds the HTML layer)
+JS_STRING_ESCAPE = str.maketrans({'\\': '\\\\', "'": "\\'"})
+
+@functools.lru_cache(maxsize=None)
 def load_url_mapping(site):
-    """Load URL mapping for a specific site"""
+    """Load the filename -> URL mapping for a specific site"""
     site_config = SITE_CONFIGS[site]
+    
+    # Filenames are interned like load_cluster_data's, so lookups with them usually match by identity
+    # Prefer the mapping the crawler stores in the direction we consume it
+    try:
+        mapping = _json.loads((site_config['images_dir'] / 'filename_to_url.json').read_bytes())
+        return {sys.intern(filename): url for filename, url in mapping.items()}
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading filename mapping for {site}: {e}")
+    
     url_mapping_file = site_config['images_dir'] / 'url_mapping.json'
     
-    if not url_mapping_file.exists():
+    # Open directly instead of exists() + open(): one syscall instead of two
+    try:
+        data = url_mapping_file.read_bytes()
+    except FileNotFoundError:
         print(f"Warning: {url_mapping_file} not found for {site}")
         return {}
     
     try:
-        with open(url_mapping_file, 'r') as f:
-            url_mapping = json.load(f)
+        url_mapping = _json.loads(data)
         # Reverse the mapping to go from filename to URL
-        filename_to_url = {v: k for k, v in url_mapping.items()}
-        return filename_to_url
+        return {sys.intern(filename): url for url, filename in url_mapping.items()}
     except Exception as e:
         print(f"Error loading URL mapping for {site}: {e}")
         return {}
@@ -66,22 +100,51 @@ def load_cluster_data(site):
     site_config = SITE_CONFIGS[site]
     csv_file = site_config['csv_file']
     
-    if not csv_file.exists():
+    try:
+        csv_stat = os.stat(csv_file)
+    except FileNotFoundError:
         print(f"Error: {csv_file} not found for {site}. Run the deduplication script first.")
         return None
     
-    clusters = defaultdict(list)
-    with open(csv_file, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            cluster_id = row['cluster_id']
-            clusters[cluster_id].append({
-                'filename': row['filename'],
-                'path': row['path'],
-                'canonical': row['canonical'] == 'True',
-                'distance': float(row['distance_to_canonical'])
-            })
+    # Reuse the previous run's parse while the CSV (and this generator) are unchanged
+    cache_key = (str(csv_file), csv_stat.st_mtime_ns, csv_stat.st_size, _SOURCE_HASH)
+    clusters = load_cluster_cache(site, cache_key)
+    if clusters is not None:
+        return clusters
+    
+    with open(csv_file, 'r', newline='') as f:
+        # Positional reader: locate the columns once instead of building a dict per row
+        reader = csv.reader(f)
+        header = next(reader)
+        i_id, i_fn, i_can, i_dist = (
+            header.index(name)
+            for name in ('cluster_id', 'filename', 'canonical', 'distance_to_canonical')
+        )
+        rows = list(reader)
+    
+    # Bucket rows by cluster_id in one numpy pass instead of a defaultdict append per row
+    cluster_ids = np.array([row[i_id] for row in rows])
+    order = np.argsort(cluster_ids, kind='stable')
+    unique_ids, starts = np.unique(cluster_ids[order], return_index=True)
+    ends = np.append(starts[1:], len(rows))
     
+    # Keep clusters in the order they first appear in the CSV
+    clusters = {}
+    for _, cluster_id, start, end in sorted(zip(order[starts], unique_ids, starts, ends)):
+        # The CSV's path column is never rendered, so it is not carried into workers or page hashes
+        screenshots = [
+            {
+                'filename': sys.intern(row[i_fn]),
+                'canonical': row[i_can] == 'True',
+                'distance': float(row[i_dist])
+            }
+            for row in (rows[j] for j in order[start:end])
+        ]
+        # Sort each cluster once: canonical first, then by similarity to it
+        screenshots.sort(key=lambda s: (not s['canonical'], s['distance']))
+        clusters[str(cluster_id)] = screenshots
+    
+    save_cluster_cache(site, cache_key, clusters)
     return clusters
 
 def get_cluster_summary(clusters, site):
@@ -97,138 +160,135 @@ def get_cluster_summary(clusters, site):
         'clusters': clusters
     }
 
-def calculate_cluster_importance(cluster_size, avg_distance, site_type, canonical_filename, cluster_id):
-    """Calculate importance score for a cluster based on multiple factors"""
+# Filename keywords used to classify layouts, checked in priority order
+CRITICAL_HOMEPAGE = frozenset({'homepage', 'index', 'main', 'navigation'})
+TOPLEVEL_NAV = frozenset({'magazine', 'research', 'cultural', 'education', 'archives', 'about'})
+FESTIVAL_NAV = frozenset({'festival', 'visit', 'learn', 'schedule', 'sponsors'})
+PROGRAM_PAGES = frozenset({'schedule', 'program', 'events', 'festival'})
+VISITOR_PAGES = frozenset({'visit', 'visitor', 'information', 'directions'})
+ABOUT_PAGES = frozenset({'about', 'mission', 'history'})
+CONTENT_PAGES = frozenset({'blog', 'news', 'article', 'story'})
+ARCHIVE_PAGES = frozenset({'archive', 'past', 'history', 'legacy'})
+UTILITY_PAGES = frozenset({'search', 'contact', 'legal', 'privacy'})
+
+# (keywords, layout_importance, layout_reason, is_critical_page)
+LAYOUT_RULES = (
+    # Homepage and main navigation layouts (ALWAYS high priority)
+    (CRITICAL_HOMEPAGE, 1.0, "Critical page type (homepage/navigation)", True),
+    # Top-level navigation categories (ALWAYS high priority)
+    (TOPLEVEL_NAV, 1.0, "Critical page type (top-level navigation)", True),
+    # Festival-specific navigation categories (ALWAYS high priority)
+    (FESTIVAL_NAV, 1.0, "Critical page type (top-level navigation)", True),
+    (PROGRAM_PAGES, 0.9, "Important page type (program/schedule)", False),
+    (VISITOR_PAGES, 0.8, "Important page type (visitor info)", False),
+    (ABOUT_PAGES, 0.7, "Important page type (about/mission)", False),
+    (CONTENT_PAGES, 0.6, "Content page type (blog/article)", False),
+    (ARCHIVE_PAGES, 0.5, "Archive page type (historical)", False),
+    (UTILITY_PAGES, 0.4, "Utility page type (search/contact)", False),
+)
+
+# (importance_level, dominant_factor) -> explanation template
+EXPLANATION_TEMPLATES = {
+    ('high', 'layout'): "High priority: {reason}",
+    ('high', 'size'): "High priority: Frequently used layout ({n} similar pages)",
+    ('high', 'consistency'): "High priority: {reason} + good consistency",
+    ('medium', 'layout'): "Medium priority: {reason}",
+    ('medium', 'size'): "Medium priority: Moderately used layout ({n} similar pages)",
+    ('low', 'unique'): "Low priority: Unique layout (single page)",
+    ('low', 'usage'): "Low priority: {reason} + limited usage",
+}
+
+@functools.lru_cache(maxsize=8192)
+def classify_layout(canonical_filename):
+    """Return (layout_importance, layout_reason, is_critical_page) for a canonical filename"""
+    name = canonical_filename.lower()
     
-    # Base importance from cluster size (but cap it to avoid overvaluing large clusters)
-    size_score = min(cluster_size / 15.0, 1.0)  # Normalize to 0-1, cap at 15+ screenshots
+    # Substring match so plurals and compounds ('articles_', 'talkstory_') still count
+    for keywords, layout_importance, layout_reason, is_critical_page in LAYOUT_RULES:
+        if any(keyword in name for keyword in keywords):
+            return layout_importance, layout_reason, is_critical_page
     
-    # Distance score (closer to canonical = more important)
-    distance_score = 1.0 - min(avg_distance, 1.0)
+    # Default for other pages
+    return 0.3, "Standard page type", False
+
+def calculate_cluster_importance(sizes, avg_distances, site_type, canonical_filenames):
+    """Calculate (levels, importance scores, explanations) for every cluster of a site at once"""
     
-    # Layout type importance - identify truly important layouts
-    layout_importance = 0.0
-    layout_reason = ""
-    is_critical_page = False
+    # Layout type importance - identify truly important layouts (one cached lookup per filename)
+    layouts = [classify_layout(filename) for filename in canonical_filenames]
+    layout_importance = np.fromiter((layout[0] for layout in layouts), dtype=np.float64, count=len(layouts))
+    is_critical_page = np.fromiter((layout[2] for layout in layouts), dtype=bool, count=len(layouts))
     
-    # Check for homepage and main navigation layouts (ALWAYS high priority)
-    if any(keyword in canonical_filename.lower() for keyword in ['homepage', 'index', 'main', 'navigation']):
-        layout_importance = 1.0
-        layout_reason = "Critical page type (homepage/navigation)"
-        is_critical_page = True
-    # Check for top-level navigation categories (ALWAYS high priority)
-    elif any(keyword in canonical_filename.lower() for keyword in ['magazine', 'research', 'cultural', 'education', 'archives', 'about']):
-        layout_importance = 1.0
-        layout_reason = "Critical page type (top-level navigation)"
-        is_critical_page = True
-    # Check for Festival-specific navigation categories (ALWAYS high priority)
-    elif any(keyword in canonical_filename.lower() for keyword in ['festival', 'visit', 'learn', 'schedule', 'sponsors']):
-        layout_importance = 1.0
-        layout_reason = "Critical page type (top-level navigation)"
-        is_critical_page = True
-    # Check for program/schedule layouts
-    elif any(keyword in canonical_filename.lower() for keyword in ['schedule', 'program', 'events', 'festival']):
-        layout_importance = 0.9
-        layout_reason = "Important page type (program/schedule)"
-    # Check for visitor information
-    elif any(keyword in canonical_filename.lower() for keyword in ['visit', 'visitor', 'information', 'directions']):
-        layout_importance = 0.8
-        layout_reason = "Important page type (visitor info)"
-    # Check for about pages
-    elif any(keyword in canonical_filename.lower() for keyword in ['about', 'mission', 'history']):
-        layout_importance = 0.7
-        layout_reason = "Important page type (about/mission)"
-    # Check for blog/content pages
-    elif any(keyword in canonical_filename.lower() for keyword in ['blog', 'news', 'article', 'story']):
-        layout_importance = 0.6
-        layout_reason = "Content page type (blog/article)"
-    # Check for archive/historical pages
-    elif any(keyword in canonical_filename.lower() for keyword in ['archive', 'past', 'history', 'legacy']):
-        layout_importance = 0.5
-        layout_reason = "Archive page type (historical)"
-    # Check for utility pages
-    elif any(keyword in canonical_filename.lower() for keyword in ['search', 'contact', 'legal', 'privacy']):
-        layout_importance = 0.4
-        layout_reason = "Utility page type (search/contact)"
-    # Default for other pages
-    else:
-        layout_importance = 0.3
-        layout_reason = "Standard page type"
+    # Base importance from cluster size (but cap it to avoid overvaluing large clusters)
+    size_score = np.minimum(sizes / 15.0, 1.0)  # Normalize to 0-1, cap at 15+ screenshots
+    
+    # Distance score (closer to canonical = more important)
+    distance_score = 1.0 - np.minimum(avg_distances, 1.0)
     
     # Site-specific importance (festival might be more important than folklife)
     site_multiplier = 1.1 if site_type == 'festival' else 1.0
     
+    # Combined importance score (0-1)
+    # Weight: Layout type (50%), Size (25%), Consistency (15%), Site (10%)
+    importance = (
+        layout_importance * 0.5 + 
+        size_score * 0.25 + 
+        distance_score * 0.15
+    ) * site_multiplier
+    
     # For critical pages (homepage, navigation), force high priority
-    if is_critical_page:
-        importance = 0.85  # Force high priority
-    else:
-        # Combined importance score (0-1)
-        # Weight: Layout type (50%), Size (25%), Consistency (15%), Site (10%)
-        importance = (
-            layout_importance * 0.5 + 
-            size_score * 0.25 + 
-            distance_score * 0.15
-        ) * site_multiplier
+    importance = np.where(is_critical_page, 0.85, importance)
     
     # Ensure importance is within bounds
-    importance = max(0.0, min(1.0, importance))
+    importance = np.clip(importance, 0.0, 1.0)
     
     # Convert to importance level
-    if importance >= 0.7:
-        level = 'high'
-    elif importance >= 0.4:
-        level = 'medium'
-    else:
-        level = 'low'
+    levels = np.select([importance >= 0.7, importance >= 0.4], ['high', 'medium'], 'low')
     
-    # Create explanation for the importance level
-    if level == 'high':
-        if is_critical_page:
-            explanation = f"High priority: {layout_reason}"
-        elif layout_importance >= 0.9:
-            explanation = f"High priority: {layout_reason}"
-        elif size_score >= 0.8:
-            explanation = f"High priority: Frequently used layout ({cluster_size} similar pages)"
-        else:
-            explanation = f"High priority: {layout_reason} + good consistency"
-    elif level == 'medium':
-        if layout_importance >= 0.7:
-            explanation = f"Medium priority: {layout_reason}"
-        elif size_score >= 0.6:
-            explanation = f"Medium priority: Moderately used layout ({cluster_size} similar pages)"
-        else:
-            explanation = f"Medium priority: {layout_reason}"
-    else:
-        if cluster_size == 1:
-            explanation = f"Low priority: Unique layout (single page)"
-        else:
-            explanation = f"Low priority: {layout_reason} + limited usage"
+    # Pick the factor that best explains each level, then fill in its template
+    factors = np.select(
+        [
+            (levels == 'high') & (is_critical_page | (layout_importance >= 0.9)),
+            (levels == 'high') & (size_score >= 0.8),
+            levels == 'high',
+            (levels == 'medium') & (layout_importance < 0.7) & (size_score >= 0.6),
+            levels == 'medium',
+            sizes == 1,
+        ],
+        ['layout', 'size', 'consistency', 'size', 'layout', 'unique'],
+        'usage'
+    )
+    explanations = [
+        EXPLANATION_TEMPLATES[level, factor].format(reason=layout[1], n=size)
+        for level, factor, layout, size in zip(levels.tolist(), factors.tolist(), layouts, sizes.tolist())
+    ]
     
-    return level, importance, explanation
+    return levels.tolist(), importance, explanations
 
-def generate_main_page(summary, site_configs):
-    """Generate the main index page with site switching and importance filtering"""
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{summary['site_config']['display_name']} Layouts Viewer</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; }}
+# Badge text for each importance level
+IMPORTANCE_LABELS = {'high': 'HIGH', 'medium': 'MEDIUM', 'low': 'LOW'}
+
+@functools.lru_cache(maxsize=8192)
+def layout_title(filename):
+    """Return the card title for a canonical filename"""
+    return filename.replace('.png', '').replace('_', ' ').title()
+
+# Index page stylesheet, written once to styles.css
+MAIN_CSS = """
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; }
         
         /* Site Toggle Toolbar */
-        .site-toolbar {{ 
+        .site-toolbar { 
             background: #34495e; 
             padding: 1rem 2rem; 
             display: flex; 
             justify-content: space-between; 
             align-items: center;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .site-toggle {{ display: flex; gap: 0.5rem; }}
-        .site-btn {{ 
+        }
+        .site-toggle { display: flex; gap: 0.5rem; }
+        .site-btn { 
             padding: 0.75rem 1.5rem; 
             border: 2px solid white; 
             border-radius: 6px; 
@@ -239,38 +299,36 @@ def generate_main_page(summary, site_configs):
             display: inline-block;
             background: transparent;
             color: white;
-        }}
-        .site-btn.active {{ 
+        }
+        .site-btn.active { 
             background: rgba(255, 255, 255, 0.2); 
             color: white; 
             border-color: white;
             box-shadow: 0 2px 8px rgba(0,0,0,0.3);
-        }}
-        .site-btn:not(.active) {{ 
+        }
+        .site-btn:not(.active) { 
             background: transparent; 
             color: white; 
             border-color: rgba(255, 255, 255, 0.7);
-        }}
-        .site-btn:hover:not(.active) {{ 
+        }
+        .site-btn:hover:not(.active) { 
             background: rgba(255, 255, 255, 0.1); 
             border-color: white;
             transform: translateY(-1px);
-        }}
-        .site-info {{ color: white; font-size: 0.9rem; opacity: 0.8; }}
+        }
+        .site-info { color: white; font-size: 0.9rem; opacity: 0.8; }
         
-        .header {{ 
-            background: {summary['site_config']['color']}; 
+        .header { 
+            background: var(--site-color); 
             color: white; 
             padding: 2rem; 
             text-align: center; 
-        }}
-        .header h1 {{ font-size: 2.5rem; margin-bottom: 0.5rem; }}
-        .header p {{ font-size: 1.1rem; opacity: 0.9; }}
-        
-        .container {{ max-width: 1400px; margin: 0 auto; padding: 2rem; }}
+        }
+        .header h1 { font-size: 2.5rem; margin-bottom: 0.5rem; }
+        .header p { font-size: 1.1rem; opacity: 0.9; }
         
         /* Importance Filter Bar */
-        .importance-filter {{ 
+        .importance-filter { 
             background: white; 
             padding: 1.5rem; 
             border-radius: 8px; 
@@ -280,14 +338,14 @@ def generate_main_page(summary, site_configs):
             align-items: center;
             gap: 1rem;
             flex-wrap: wrap;
-        }}
-        .filter-label {{ 
+        }
+        .filter-label { 
             font-weight: 600; 
             color: #495057; 
             margin-right: 0.5rem;
-        }}
-        .filter-buttons {{ display: flex; gap: 0.5rem; flex-wrap: wrap; }}
-        .filter-btn {{ 
+        }
+        .filter-buttons { display: flex; gap: 0.5rem; flex-wrap: wrap; }
+        .filter-btn { 
             padding: 0.5rem 1rem; 
             border: 2px solid #dee2e6; 
             border-radius: 6px; 
@@ -297,35 +355,29 @@ def generate_main_page(summary, site_configs):
             font-weight: 500; 
             transition: all 0.2s;
             font-size: 0.9rem;
-        }}
-        .filter-btn:hover {{ 
-            border-color: {summary['site_config']['color']}; 
-            color: {summary['site_config']['color']};
-        }}
-        .filter-btn.active {{ 
-            background: {summary['site_config']['color']}; 
+        }
+        .filter-btn:hover { 
+            border-color: var(--site-color); 
+            color: var(--site-color);
+        }
+        .filter-btn.active { 
+            background: var(--site-color); 
             color: white; 
-            border-color: {summary['site_config']['color']};
-        }}
-        .filter-btn.count {{ 
+            border-color: var(--site-color);
+        }
+        .filter-btn.count { 
             background: #f8f9fa; 
             border-color: #ced4da;
             color: #495057;
-        }}
-        
-        .stats {{ background: white; padding: 1.5rem; border-radius: 8px; margin-bottom: 2rem; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-        .stats-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; }}
-        .stat-item {{ text-align: center; }}
-        .stat-number {{ font-size: 2rem; font-weight: bold; color: {summary['site_config']['color']}; }}
-        .stat-label {{ color: #7f8c8d; margin-top: 0.5rem; }}
+        }
         
-        .clusters-grid {{ 
+        .clusters-grid { 
             display: grid; 
             grid-template-columns: repeat(auto-fill, minmax(400px, 1fr)); 
             gap: 3rem; 
             padding: 1rem 0;
-        }}
-        .cluster-card {{ 
+        }
+        .cluster-card { 
             background: white; 
             border-radius: 20px; 
             overflow: hidden; 
@@ -337,15 +389,15 @@ def generate_main_page(summary, site_configs):
             height: 100%;
             display: flex;
             flex-direction: column;
-        }}
-        .cluster-card:hover {{ 
+        }
+        .cluster-card:hover { 
             transform: translateY(-8px) scale(1.02); 
             box-shadow: 0 20px 60px rgba(0,0,0,0.15);
             border-color: rgba(0,0,0,0.1);
-        }}
+        }
         
         /* Importance Label */
-        .importance-label {{ 
+        .importance-label { 
             position: absolute; 
             top: 1rem; 
             right: 1rem; 
@@ -356,209 +408,126 @@ def generate_main_page(summary, site_configs):
             text-transform: uppercase; 
             letter-spacing: 0.5px;
             z-index: 10;
-        }}
-        .importance-label.high {{ 
+        }
+        .importance-label.high { 
             background: #dc3545; 
             color: white; 
             box-shadow: 0 2px 8px rgba(220, 53, 69, 0.3);
-        }}
-        .importance-label.medium {{ 
+        }
+        .importance-label.medium { 
             background: #fd7e14; 
             color: white; 
             box-shadow: 0 2px 8px rgba(253, 126, 20, 0.3);
-        }}
-        .importance-label.low {{ 
+        }
+        .importance-label.low { 
             background: #6c757d; 
             color: white; 
             box-shadow: 0 2px 8px rgba(108, 117, 125, 0.3);
-        }}
+        }
         
-        .cluster-header-top {{
+        .cluster-header-top {
             background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
             padding: 1rem 1.5rem 0.75rem 1.5rem;
             border-bottom: 1px solid rgba(0,0,0,0.05);
             position: relative;
-        }}
-        .cluster-header-top::before {{
+        }
+        .cluster-header-top::before {
             content: '';
             position: absolute;
             top: 0;
             left: 0;
             right: 0;
             height: 4px;
-            background: linear-gradient(90deg, {summary['site_config']['color']}, {summary['site_config']['color']}dd);
-        }}
-        .cluster-explanation {{
+            background: linear-gradient(90deg, var(--site-color), var(--site-color-soft));
+        }
+        .cluster-explanation {
             font-size: 0.95rem;
             font-weight: 500;
             color: #6c757d;
             margin-top: 0.25rem;
             line-height: 1.4;
-        }}
+        }
         
-        .cluster-main-content {{
+        .cluster-main-content {
             display: flex;
             flex-direction: column;
             flex: 1;
-        }}
+        }
         
-        .cluster-image-section {{
+        .cluster-image-section {
             padding: 1rem 1.5rem;
             background: #fafbfc;
-        }}
+        }
         
-        .cluster-info-section {{
+        .cluster-info-section {
             padding: 1rem 1.5rem 1.5rem 1.5rem;
             background: white;
             display: flex;
             flex-direction: column;
             flex: 1;
-        }}
+        }
         
-        .cluster-header {{ 
+        .cluster-header { 
             margin-bottom: 1rem;
-        }}
-        .cluster-title {{ 
-            font-size: 1.4rem; 
-            font-weight: 700; 
-            color: #1a1a1a; 
-            margin-bottom: 0.5rem; 
-            letter-spacing: -0.02em;
-            line-height: 1.3;
-        }}
-        .cluster-size {{ 
-            color: #6c757d; 
-            font-size: 0.9rem; 
-            font-weight: 500;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }}
-        .canonical-image {{ 
-            width: 100%; 
-            height: 220px; 
-            object-fit: cover; 
-            transition: transform 0.3s ease;
-            border-radius: 12px;
-            box-shadow: 0 4px 16px rgba(0,0,0,0.1);
-        }}
-        .cluster-card:hover .canonical-image {{
-            transform: scale(1.02);
-        }}
-        .cluster-preview {{ 
-            margin-bottom: 1.25rem;
-            padding-top: 0.75rem;
-            border-top: 1px solid #f1f3f4;
-        }}
-        .preview-grid {{ 
-            display: grid; 
-            grid-template-columns: repeat(auto-fit, minmax(80px, 1fr)); 
-            gap: 0.75rem; 
-            max-width: 100%;
-            margin-top: 0.75rem;
-        }}
-        .preview-thumb {{ 
-            width: 100%; 
-            height: 60px; 
-            object-fit: cover; 
-            border-radius: 8px; 
-            transition: transform 0.2s ease;
-            cursor: pointer;
-            border: 2px solid transparent;
-        }}
-        .preview-thumb:hover {{
-            transform: scale(1.05);
-            border-color: {summary['site_config']['color']};
-        }}
-        .cluster-actions {{
-            display: flex;
-            flex-direction: column;
-            gap: 0.75rem;
-            padding-top: 0.75rem;
-            border-top: 1px solid #f1f3f4;
-        }}
-        .view-btn {{ 
-            background: {summary['site_config']['color']}; 
-            color: white; 
-            padding: 0.875rem 1.5rem; 
-            border-radius: 8px; 
-            text-decoration: none; 
-            font-weight: 600; 
-            text-align: center; 
-            transition: all 0.2s ease;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.15);
-        }}
-        .view-btn:hover {{ 
-            transform: translateY(-2px); 
-            box-shadow: 0 4px 16px rgba(0,0,0,0.25);
-        }}
-        .canonical-page-link {{ 
-            background: #f8f9fa; 
-            color: #495057; 
-            padding: 0.75rem 1.25rem; 
-            border-radius: 8px; 
-            text-decoration: none; 
-            font-weight: 500; 
-            text-align: center; 
-            transition: all 0.2s ease;
-            border: 1px solid #e9ecef;
-        }}
-        .canonical-page-link:hover {{ 
-            background: #e9ecef; 
-            border-color: #dee2e6;
-        }}
-        
-        .cluster-header {{ 
             background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%); 
             padding: 2rem; 
             border-bottom: 1px solid rgba(0,0,0,0.05);
             position: relative;
-        }}
-        .cluster-header::before {{
+        }
+        .cluster-header::before {
             content: '';
             position: absolute;
             top: 0;
             left: 0;
             right: 0;
             height: 4px;
-            background: linear-gradient(90deg, {summary['site_config']['color']}, {summary['site_config']['color']}dd);
-        }}
-        .cluster-title {{ 
+            background: linear-gradient(90deg, var(--site-color), var(--site-color-soft));
+        }
+        .cluster-title { 
             font-size: 1.5rem; 
             font-weight: 700; 
             color: #1a1a1a; 
             margin-bottom: 0.75rem; 
             letter-spacing: -0.02em;
-        }}
-        .cluster-size {{ 
+            line-height: 1.3;
+        }
+        .cluster-size { 
             color: #6c757d; 
             font-size: 1rem; 
-            font-weight: 500; 
+            font-weight: 500;
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
             opacity: 0.8;
-        }}
-        .canonical-image {{ 
+        }
+        .canonical-image { 
             width: 100%; 
             height: 220px; 
             object-fit: cover; 
             transition: transform 0.3s ease;
-        }}
-        .cluster-card:hover .canonical-image {{
+            border-radius: 12px;
+            box-shadow: 0 4px 16px rgba(0,0,0,0.1);
+        }
+        .cluster-card:hover .canonical-image {
             transform: scale(1.05);
-        }}
-        .cluster-preview {{ 
+        }
+        .cluster-preview { 
+            margin-bottom: 1.25rem;
             padding: 2.5rem; 
+            border-top: 1px solid #f1f3f4;
             background: linear-gradient(180deg, #ffffff 0%, #fafbfc 100%);
-        }}
-        .preview-grid {{ 
+        }
+        .preview-grid { 
             display: grid; 
             grid-template-columns: repeat(4, 1fr); 
             gap: 1rem; 
+            max-width: 100%;
             margin: 2rem 0; 
             padding: 1.5rem;
             background: rgba(255,255,255,0.7);
             border-radius: 16px;
             border: 1px solid rgba(0,0,0,0.05);
-        }}
-        .preview-thumb {{ 
+        }
+        .preview-thumb { 
             width: 100%; 
             height: 60px; 
             object-fit: cover; 
@@ -566,25 +535,33 @@ def generate_main_page(summary, site_configs):
             border: 2px solid rgba(0,0,0,0.05);
             transition: all 0.3s ease;
             cursor: pointer;
-        }}
-        .preview-thumb:hover {{
+        }
+        .preview-thumb:hover {
             transform: scale(1.1);
-            border-color: {summary['site_config']['color']};
+            border-color: var(--site-color);
             box-shadow: 0 4px 16px rgba(0,0,0,0.15);
-        }}
-        .view-all {{ 
+        }
+        .cluster-actions {
+            display: flex;
+            flex-direction: column;
+            gap: 0.75rem;
+            padding-top: 0.75rem;
+            border-top: 1px solid #f1f3f4;
+        }
+        .view-all { 
             text-align: center; 
             margin-top: 2rem; 
             display: flex;
             flex-direction: column;
             gap: 1rem;
             align-items: center;
-        }}
-        .view-btn {{ 
-            background: linear-gradient(135deg, {summary['site_config']['color']}, {summary['site_config']['color']}dd); 
+        }
+        .view-btn { 
+            background: linear-gradient(135deg, var(--site-color), var(--site-color-soft)); 
             color: white; 
             padding: 1rem 2.5rem; 
             text-decoration: none; 
+            text-align: center; 
             border-radius: 16px; 
             display: inline-block; 
             transition: all 0.3s cubic-bezier(0.175, 0.885, 0.32, 1.275);
@@ -595,8 +572,8 @@ def generate_main_page(summary, site_configs):
             cursor: pointer;
             position: relative;
             overflow: hidden;
-        }}
-        .view-btn::before {{
+        }
+        .view-btn::before {
             content: '';
             position: absolute;
             top: 0;
@@ -605,55 +582,55 @@ def generate_main_page(summary, site_configs):
             height: 100%;
             background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
             transition: left 0.5s;
-        }}
-        .view-btn:hover::before {{
+        }
+        .view-btn:hover::before {
             left: 100%;
-        }}
-        .view-btn:hover {{ 
+        }
+        .view-btn:hover { 
             transform: translateY(-2px);
             box-shadow: 0 12px 32px rgba(0,0,0,0.25);
-            background: linear-gradient(135deg, {summary['site_config']['color']}dd, {summary['site_config']['color']});
-        }}
-        .view-btn:active {{ 
+            background: linear-gradient(135deg, var(--site-color-soft), var(--site-color));
+        }
+        .view-btn:active { 
             transform: translateY(0);
             box-shadow: 0 6px 20px rgba(0,0,0,0.2);
-        }}
-        .loading {{ text-align: center; padding: 2rem; color: #7f8c8d; }}
+        }
+        .loading { text-align: center; padding: 2rem; color: #7f8c8d; }
         
         /* Hidden cards for filtering */
-        .cluster-card.hidden {{ display: none; }}
+        .cluster-card.hidden { display: none; }
         
         /* Skeleton Loading */
-        .skeleton {{
+        .skeleton {
             animation: skeleton-loading 1.5s ease-in-out infinite;
-        }}
+        }
         
-        @keyframes skeleton-loading {{
-            0% {{ opacity: 1; }}
-            50% {{ opacity: 0.7; }}
-            100% {{ opacity: 1; }}
-        }}
+        @keyframes skeleton-loading {
+            0% { opacity: 1; }
+            50% { opacity: 0.7; }
+            100% { opacity: 1; }
+        }
         
-        .skeleton .canonical-image {{
+        .skeleton .canonical-image {
             background: linear-gradient(90deg, #f0f0f0 25%, #e0e0e0 50%, #f0f0f0 75%);
             background-size: 200% 100%;
             animation: skeleton-shimmer 1.5s infinite;
-        }}
+        }
         
-        @keyframes skeleton-shimmer {{
-            0% {{ background-position: -200% 0; }}
-            100% {{ background-position: 200% 0; }}
-        }}
+        @keyframes skeleton-shimmer {
+            0% { background-position: -200% 0; }
+            100% { background-position: 200% 0; }
+        }
         
         /* Responsive adjustments */
-        @media (max-width: 768px) {{
-            .importance-filter {{ flex-direction: column; align-items: stretch; }}
-            .filter-buttons {{ justify-content: center; }}
-            .clusters-grid {{ grid-template-columns: 1fr; }}
-        }}
+        @media (max-width: 768px) {
+            .importance-filter { flex-direction: column; align-items: stretch; }
+            .filter-buttons { justify-content: center; }
+            .clusters-grid { grid-template-columns: 1fr; }
+        }
         
         /* Modal styles */
-        .modal {{
+        .modal {
             display: none;
             position: fixed;
             z-index: 1000;
@@ -662,16 +639,17 @@ def generate_main_page(summary, site_configs):
             width: 100%;
             height: 100%;
             background-color: rgba(0,0,0,0.9);
-        }}
-        .modal-content {{
+        }
+        .modal-content {
             margin: auto;
             display: block;
             width: 90%;
-            max-width: 1200px;
-            max-height: 90vh;
+            max-width: 90%;
+            max-height: 90%;
             object-fit: contain;
-        }}
-        .modal-close {{
+            margin-top: 2%;
+        }
+        .modal-close {
             position: absolute;
             top: 15px;
             right: 35px;
@@ -679,27 +657,28 @@ def generate_main_page(summary, site_configs):
             font-size: 40px;
             font-weight: bold;
             cursor: pointer;
-        }}
-        .modal-close:hover {{
+        }
+        .modal-close:hover {
             color: #bbb;
-        }}
+        }
         
         /* Clickable elements */
-        .clickable {{
+        .clickable {
             cursor: pointer;
-            transition: all 0.2s ease;
-        }}
-        .clickable:hover {{
-            opacity: 0.9;
-        }}
+            transition: opacity 0.2s;
+        }
+        .clickable:hover {
+            opacity: 0.8;
+        }
         
         /* Canonical page link styles */
-        .canonical-page-link {{
+        .canonical-page-link {
             display: inline-block;
             padding: 0.875rem 2rem;
             background: linear-gradient(135deg, #f8f9fa, #e9ecef);
             color: #495057;
             text-decoration: none;
+            text-align: center;
             border-radius: 16px;
             font-size: 0.95rem;
             border: 2px solid rgba(0,0,0,0.05);
@@ -708,8 +687,8 @@ def generate_main_page(summary, site_configs):
             box-shadow: 0 4px 16px rgba(0,0,0,0.08);
             position: relative;
             overflow: hidden;
-        }}
-        .canonical-page-link::before {{
+        }
+        .canonical-page-link::before {
             content: '';
             position: absolute;
             top: 0;
@@ -718,28 +697,28 @@ def generate_main_page(summary, site_configs):
             height: 100%;
             background: linear-gradient(90deg, transparent, rgba(0,0,0,0.05), transparent);
             transition: left 0.5s;
-        }}
-        .canonical-page-link:hover::before {{
+        }
+        .canonical-page-link:hover::before {
             left: 100%;
-        }}
-        .canonical-page-link:hover {{
+        }
+        .canonical-page-link:hover {
             background: linear-gradient(135deg, #e9ecef, #dee2e6);
             color: #212529;
             border-color: rgba(0,0,0,0.1);
             text-decoration: none;
             transform: translateY(-2px);
             box-shadow: 0 8px 24px rgba(0,0,0,0.15);
-        }}
+        }
         
         /* Enhanced container spacing */
-        .container {{
+        .container {
             max-width: 1600px; 
             margin: 0 auto; 
             padding: 3rem 2rem; 
-        }}
+        }
         
         /* Enhanced stats styling */
-        .stats {{
+        .stats {
             background: linear-gradient(135deg, #ffffff, #f8f9fa); 
             padding: 3rem; 
             border-radius: 24px; 
@@ -747,48 +726,40 @@ def generate_main_page(summary, site_configs):
             box-shadow: 0 8px 32px rgba(0,0,0,0.08);
             border: 1px solid rgba(255,255,255,0.2);
             backdrop-filter: blur(10px);
-        }}
-        .stats-grid {{
+        }
+        .stats-grid {
             display: grid; 
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); 
             gap: 2rem; 
-        }}
-        .stat-item {{
+        }
+        .stat-item {
             text-align: center; 
             padding: 1.5rem;
             background: rgba(255,255,255,0.7);
             border-radius: 16px;
             border: 1px solid rgba(0,0,0,0.05);
             transition: all 0.3s ease;
-        }}
-        .stat-item:hover {{
+        }
+        .stat-item:hover {
             transform: translateY(-4px);
             box-shadow: 0 8px 24px rgba(0,0,0,0.1);
-        }}
-        .stat-number {{
+        }
+        .stat-number {
             font-size: 2.5rem; 
             font-weight: 800; 
-            color: {summary['site_config']['color']}; 
+            color: var(--site-color); 
             margin-bottom: 0.5rem;
             letter-spacing: -0.02em;
-        }}
-        .stat-label {{
+        }
+        .stat-label {
             color: #6c757d; 
             margin-top: 0.5rem; 
             font-weight: 600;
             font-size: 1rem;
-        }}
-        
-        /* Modal/Lightbox styles */
-        .modal {{ display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.9); }}
-        .modal-content {{ margin: auto; display: block; max-width: 90%; max-height: 90%; margin-top: 2%; }}
-        .modal-close {{ position: absolute; top: 15px; right: 35px; color: #f1f1f1; font-size: 40px; font-weight: bold; cursor: pointer; }}
-        .modal-close:hover {{ color: #bbb; }}
-        .clickable {{ cursor: pointer; transition: opacity 0.2s; }}
-        .clickable:hover {{ opacity: 0.8; }}
+        }
         
         /* URL link styles */
-        .image-url-link {{
+        .image-url-link {
             display: inline-block;
             margin-top: 0.5rem;
             padding: 0.5rem 0.75rem;
@@ -803,372 +774,135 @@ def generate_main_page(summary, site_configs):
             overflow: hidden;
             text-overflow: ellipsis;
             white-space: nowrap;
-        }}
-        .image-url-link:hover {{
+        }
+        .image-url-link:hover {
             background: #e9ecef;
             color: #212529;
             border-color: #dee2e6;
             text-decoration: none;
-        }}
-        .url-icon {{
+        }
+        .url-icon {
             margin-right: 0.5rem;
             opacity: 0.7;
-        }}
-    </style>
-</head>
-<body>
-    <!-- Site Toggle Toolbar -->
-    <div class="site-toolbar">
-        <div class="site-toggle">
-            <a href="index.html" class="site-btn{' active' if summary['site'] == 'folklife' else ''}">
-                {site_configs['folklife']['display_name']}
-            </a>
-            <a href="index_festival.html" class="site-btn{' active' if summary['site'] == 'festival' else ''}">
-                {site_configs['festival']['display_name']}
-            </a>
-        </div>
-        <div class="site-info">
-            Currently viewing: {summary['site_config']['display_name']}
-        </div>
-    </div>
-    
-    <div class="header">
-        <h1>{summary['site_config']['display_name']} Layouts Viewer</h1>
-        <p>Visual overview of {summary['total_clusters']} unique layouts from {summary['total_screenshots']} screenshots</p>
-        <p style="font-size: 0.9rem; opacity: 0.8; margin-top: 0.5rem;">
-            💡 <strong>How it works:</strong> Each cluster groups screenshots with similar visual layouts. 
-            Images are sorted by similarity to the "canonical" (most representative) image.
-            <strong>Importance levels</strong> are calculated based on cluster size and layout consistency.
-        </p>
-    </div>
-    
-    <div class="container">
-        <!-- Importance Filter Bar -->
-        <div class="importance-filter">
-            <div class="filter-label">Filter by Importance:</div>
-            <div class="filter-buttons">
-                <button class="filter-btn active" data-filter="all" onclick="filterByImportance('all')">
-                    All Layouts
-                </button>
-                <button class="filter-btn" data-filter="high" onclick="filterByImportance('high')">
-                    🔴 High Priority
-                </button>
-                <button class="filter-btn" data-filter="medium" onclick="filterByImportance('medium')">
-                    🟠 Medium Priority
-                </button>
-                <button class="filter-btn" data-filter="low" onclick="filterByImportance('low')">
-                    ⚫ Low Priority
-                </button>
-            </div>
-            <div class="filter-btn count" id="filterCount">
-                Showing all {summary['total_clusters']} layouts
-            </div>
-        </div>
-        
-        <div class="stats">
-            <div class="stats-grid">
-                <div class="stat-item">
-                    <div class="stat-number">{summary['total_clusters']}</div>
-                    <div class="stat-label">Unique Layouts</div>
-                </div>
-                <div class="stat-item">
-                    <div class="stat-number">{summary['total_screenshots']}</div>
-                    <div class="stat-label">Total Screenshots</div>
-                </div>
-                <div class="stat-item">
-                    <div class="stat-number">{summary['total_screenshots'] / summary['total_clusters']:.1f}</div>
-                    <div class="stat-label">Avg per Cluster</div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Importance Calculation Info -->
-        <div class="stats" style="margin-bottom: 1rem;">
-            <h3 style="margin-bottom: 1rem; color: #495057;">How Importance is Calculated</h3>
-            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1rem; font-size: 0.9rem;">
-                <div style="background: #f8f9fa; padding: 1rem; border-radius: 6px; border-left: 4px solid #dc3545;">
-                    <strong>🔴 High Priority (≥0.7):</strong> Homepage, navigation, program schedules, visitor info
-                </div>
-                <div style="background: #f8f9fa; padding: 1rem; border-radius: 6px; border-left: 4px solid #fd7e14;">
-                    <strong>🟠 Medium Priority (0.4-0.69):</strong> About pages, blog posts, content pages
-                </div>
-                <div style="background: #f8f9fa; padding: 1rem; border-radius: 6px; border-left: 4px solid #6c757d;">
-                    <strong>⚫ Low Priority (<0.4):</strong> Archive pages, utility pages, less critical layouts
-                </div>
-            </div>
-            <p style="margin-top: 1rem; font-size: 0.85rem; color: #6c757d;">
-                <strong>Formula:</strong> Layout Type (50%) + Cluster Size (25%) + Consistency (15%) + Site Priority (10%)
-            </p>
-        </div>
-        
-        <div class="clusters-grid">"""
-    
-    # Load URL mapping for this site
-    url_mapping = load_url_mapping(summary['site'])
-    
-    # Sort clusters by size (largest first) and calculate importance
-    sorted_clusters = []
-    for cluster_id, screenshots in summary['clusters'].items():
-        # Calculate average distance for importance scoring
-        avg_distance = sum(s['distance'] for s in screenshots) / len(screenshots)
-        
-        # Find canonical image for importance calculation
-        canonical = next((s for s in screenshots if s['canonical']), screenshots[0])
-        
-        importance_level, importance_score, explanation = calculate_cluster_importance(
-            len(screenshots), avg_distance, summary['site'], canonical['filename'], cluster_id
-        )
-        
-        sorted_clusters.append({
-            'cluster_id': cluster_id,
-            'screenshots': screenshots,
-            'importance_level': importance_level,
-            'importance_score': importance_score,
-            'explanation': explanation
+        }
+"""
+
+# Page templates live next to this script; compiled template bytecode is cached between runs
+TEMPLATES_ENV = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / 'templates'),
+    autoescape=select_autoescape(['html', 'j2']),
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+TEMPLATES_ENV.filters['js_arg'] = lambda text: text.translate(JS_STRING_ESCAPE)  # autoescape adds the HTML layer
+MAIN_TEMPLATE = TEMPLATES_ENV.get_template('main.html.j2')
+DETAIL_TEMPLATE = TEMPLATES_ENV.get_template('detail.html.j2')
+
+def build_cards_manifest(summary, cluster_ids, order, levels, explanations, url_mapping):
+    """Serialize every index card, in display order, as compact JSON for client-side rendering"""
+    cards = []
+    for i in order.tolist():
+        screenshots = summary['clusters'][cluster_ids[i]]
+        canonical = screenshots[0]['filename']
+        cards.append({
+            'id': cluster_ids[i],
+            'size': len(screenshots),
+            'importance': levels[i],
+            'explanation': explanations[i],
+            'canonical': canonical,
+            'title': layout_title(canonical),
+            'url': url_mapping.get(canonical, ''),
+            'previews': [s['filename'] for s in screenshots[:MAX_IMAGES_PER_CLUSTER]]
         })
+    manifest = _json.dumps({
+        'site': summary['site'],
+        'cdn': CDN_PREFIXES[summary['site']],
+        'initial': INITIAL_CARDS,
+        'cards': cards
+    })
+    if isinstance(manifest, bytes):
+        manifest = manifest.decode('utf-8')
+    # Keep the payload from closing its <script> element early
+    return manifest.replace('</', '<\\/')
+
+def generate_main_page(summary, site_configs, url_mapping, out_fp):
+    """Write the main index page with site switching and importance filtering to a binary file object"""
+    clusters = summary['clusters']
+    cluster_ids = list(clusters)
+    sizes = np.fromiter((len(clusters[c]) for c in cluster_ids), dtype=np.int64, count=len(cluster_ids))
     
-    # Sort by importance score first, then by size
-    sorted_clusters.sort(key=lambda x: (x['importance_score'], len(x['screenshots'])), reverse=True)
+    # Average distance of every cluster in one pass over all rows' distances
+    owners = np.repeat(np.arange(len(cluster_ids)), sizes)
+    distances = np.fromiter(
+        (s['distance'] for c in cluster_ids for s in clusters[c]), dtype=np.float64, count=int(sizes.sum())
+    )
+    avg_distances = np.bincount(owners, weights=distances, minlength=len(cluster_ids)) / sizes
     
-    # Generate cluster cards
-    for cluster_data in sorted_clusters:
-        cluster_id = cluster_data['cluster_id']
-        screenshots = cluster_data['screenshots']
-        importance_level = cluster_data['importance_level']
-        importance_score = cluster_data['importance_score']
-        explanation = cluster_data['explanation']
-        
-        # Get canonical image (first image with canonical=True)
-        canonical = next((s for s in screenshots if s['canonical']), screenshots[0])
-        
-        # Get preview images (up to MAX_IMAGES_PER_CLUSTER)
-        preview_images = screenshots[:MAX_IMAGES_PER_CLUSTER]
-        
-        # Get canonical URL if available
-        canonical_url = url_mapping.get(canonical['filename'], '')
-        
-        html += f"""
-            <div class="cluster-card skeleton" data-importance="{importance_level}">
-                <div class="cluster-header-top">
-                    <div class="importance-label {importance_level}">{importance_level.upper()}</div>
-                    <div class="cluster-explanation">
-                        {explanation}
-                    </div>
-                </div>
-                
-                <div class="cluster-main-content">
-                    <div class="cluster-image-section">
-                        <img src="{SPACES_CDN_BASE}/{summary['site']}/{canonical['filename']}" 
-                             alt="Canonical" 
-                             class="canonical-image clickable" 
-                             onclick="openModal('{canonical['filename']}', '{summary['site']}')">
-                    </div>
-                    
-                    <div class="cluster-info-section">
-                        <div class="cluster-header">
-                            <div class="cluster-title">Layout {cluster_id}: {canonical['filename'].replace('.png', '').replace('_', ' ').title()}</div>
-                            <div class="cluster-size">{len(screenshots)} screenshots</div>
-                        </div>
-                        
-                        <div class="cluster-preview">
-                            <div class="preview-grid">"""
-        
-        for screenshot in preview_images:
-            html += f"""
-                                <img src="{SPACES_CDN_BASE}/{summary['site']}/{screenshot['filename']}" 
-                                     alt="{screenshot['filename']}" 
-                                     class="preview-thumb clickable" 
-                                     title="{screenshot['filename']}" 
-                                     onclick="openModal('{screenshot['filename']}', '{summary['site']}')">"""
-        
-        html += f"""
-                            </div>
-                        </div>
-                        
-                        <div class="cluster-actions">
-                            <a href="layout_{summary['site']}_{cluster_id}.html" class="view-btn">View All {len(screenshots)} Images</a>"""
-        
-        # Add canonical page link if available
-        if canonical_url:
-            html += f"""
-                            <a href="{canonical_url}" target="_blank" class="canonical-page-link">🔗 View Source Page</a>"""
-        
-        html += f"""
-                        </div>
-                    </div>
-                </div>
-            </div>"""
+    # Each cluster's canonical image (always first after load_cluster_data's sort) drives importance
+    canonical_filenames = [clusters[cluster_id][0]['filename'] for cluster_id in cluster_ids]
     
-    html += """
-        </div>
-    </div>
+    levels, importance_scores, explanations = calculate_cluster_importance(
+        sizes, avg_distances, summary['site'], canonical_filenames
+    )
     
-    <!-- Modal for full-size images -->
-    <div id="imageModal" class="modal">
-        <span class="modal-close" onclick="closeModal()">&times;</span>
-        <img class="modal-content" id="modalImage">
-        <div id="modalCaption" style="text-align: center; color: white; margin-top: 1rem; font-size: 1.1rem;"></div>
-    </div>
+    # Sort by importance score first, then by size (both descending, ties keep load order)
+    order = np.lexsort((-sizes, -importance_scores))
     
-    <script>
-        function openModal(filename, site) {
-            const modal = document.getElementById('imageModal');
-            const modalImg = document.getElementById('modalImage');
-            const caption = document.getElementById('modalCaption');
-            
-            modal.style.display = 'block';
-            modalImg.src = 'https://quotient.nyc3.cdn.digitaloceanspaces.com/' + site + '/' + filename;
-            caption.innerHTML = filename;
-        }
-        
-        function closeModal() {
-            document.getElementById('imageModal').style.display = 'none';
-        }
-        
-        function filterByImportance(importance) {
-            const cards = document.querySelectorAll('.cluster-card');
-            const filterBtns = document.querySelectorAll('.filter-btn');
-            let visibleCount = 0;
-            let totalScreenshots = 0;
-            
-            // Update active filter button
-            filterBtns.forEach(btn => {
-                btn.classList.remove('active');
-                if (btn.dataset.filter === importance) {
-                    btn.classList.add('active');
-                }
-            });
-            
-            // Filter cards and count screenshots
-            cards.forEach(card => {
-                if (importance === 'all' || card.dataset.importance === importance) {
-                    card.classList.remove('hidden');
-                    visibleCount++;
-                    
-                    // Extract screenshot count from the cluster-size text
-                    const sizeText = card.querySelector('.cluster-size').textContent;
-                    const screenshotMatch = sizeText.match(/(\\d+)\\s+screenshots/);
-                    if (screenshotMatch) {
-                        totalScreenshots += parseInt(screenshotMatch[1]);
-                    }
-                } else {
-                    card.classList.add('hidden');
-                }
-            });
-            
-            // Update count display
-            const countElement = document.getElementById('filterCount');
-            if (importance === 'all') {
-                countElement.textContent = `Showing all ${cards.length} layouts`;
-            } else {
-                countElement.textContent = `Showing ${visibleCount} ${importance} priority layouts`;
-            }
-            
-            // Update stats widget
-            updateStatsWidget(visibleCount, totalScreenshots);
-        }
-        
-        function updateStatsWidget(visibleLayouts, visibleScreenshots) {
-            // Update Unique Layouts count
-            const uniqueLayoutsElement = document.querySelector('.stat-number');
-            if (uniqueLayoutsElement) {
-                uniqueLayoutsElement.textContent = visibleLayouts;
-            }
-            
-            // Update Total Screenshots count
-            const totalScreenshotsElements = document.querySelectorAll('.stat-number');
-            if (totalScreenshotsElements.length > 1) {
-                totalScreenshotsElements[1].textContent = visibleScreenshots;
-            }
-            
-            // Update Average per Cluster
-            const avgPerClusterElements = document.querySelectorAll('.stat-number');
-            if (avgPerClusterElements.length > 2) {
-                const avgPerCluster = visibleLayouts > 0 ? (visibleScreenshots / visibleLayouts).toFixed(1) : '0.0';
-                avgPerClusterElements[2].textContent = avgPerCluster;
-            }
-            
-            // Update header description
-            const headerDescription = document.querySelector('.header p');
-            if (headerDescription) {
-                const totalLayouts = document.querySelectorAll('.cluster-card').length;
-                const totalScreenshots = Array.from(document.querySelectorAll('.cluster-size')).reduce((sum, el) => {
-                    const match = el.textContent.match(/(\d+)\s+screenshots/);
-                    return sum + (match ? parseInt(match[1]) : 0);
-                }, 0);
-                
-                if (visibleLayouts === totalLayouts) {
-                    headerDescription.textContent = `Visual overview of ${totalLayouts} unique layouts from ${totalScreenshots} screenshots`;
-                } else {
-                    headerDescription.textContent = `Visual overview of ${visibleLayouts} visible layouts from ${visibleScreenshots} screenshots (filtered from ${totalLayouts} total layouts)`;
-                }
-            }
-        }
-        
-        // Close modal when clicking outside the image
-        window.onclick = function(event) {
-            const modal = document.getElementById('imageModal');
-            if (event.target === modal) {
-                modal.style.display = 'none';
-            }
-        }
-        
-        // Close modal with Escape key
-        document.addEventListener('keydown', function(event) {
-            if (event.key === 'Escape') {
-                closeModal();
-            }
-        });
-        
-        // Remove skeleton loading when images load
-        document.addEventListener('DOMContentLoaded', function() {
-            const images = document.querySelectorAll('.canonical-image, .preview-thumb');
-            images.forEach(img => {
-                if (img.complete) {
-                    img.closest('.cluster-card').classList.remove('skeleton');
-                } else {
-                    img.addEventListener('load', function() {
-                        this.closest('.cluster-card').classList.remove('skeleton');
-                    });
-                }
-            });
-        });
-    </script>
-</body>
-</html>"""
-    
-    return html
-
-def generate_cluster_detail_page(cluster_id, screenshots, site, site_config):
-    """Generate a detailed page for a specific cluster"""
-    # Sort screenshots by distance (canonical first, then by similarity)
-    sorted_screenshots = sorted(screenshots, key=lambda x: (not x['canonical'], x['distance']))
-    canonical = next((s for s in screenshots if s['canonical']), screenshots[0])
+    # Layout and screenshot totals per importance level, embedded on the filter buttons
+    counts = {level: [0, 0] for level in ('all', 'high', 'medium', 'low')}
+    for importance_level, size in zip(levels, sizes.tolist()):
+        for level in ('all', importance_level):
+            counts[level][0] += 1
+            counts[level][1] += size
     
-    # Load URL mapping for this site
-    url_mapping = load_url_mapping(site)
+    # Only the first screenfuls of cards are rendered here; the page script builds the rest from the manifest
+    cards = []
+    for rank, i in enumerate(order[:INITIAL_CARDS].tolist()):
+        screenshots = clusters[cluster_ids[i]]
+        canonical = screenshots[0]['filename']
+        cards.append({
+            'id': cluster_ids[i],
+            'size': len(screenshots),
+            'importance': levels[i],
+            'label': IMPORTANCE_LABELS[levels[i]],
+            'explanation': explanations[i],
+            'canonical': canonical,
+            'title': layout_title(canonical),
+            'url': url_mapping.get(canonical, ''),
+            'previews': [s['filename'] for s in screenshots[:MAX_IMAGES_PER_CLUSTER]],
+            'eager': rank < EAGER_CARDS
+        })
     
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{site_config['display_name']} - Layout {cluster_id}</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; }}
+    # The template streams encoded chunks straight into the buffered file
+    MAIN_TEMPLATE.stream(
+        summary=summary,
+        site_configs=site_configs,
+        site=summary['site'],
+        cdn=CDN_PREFIXES[summary['site']],
+        counts=counts,
+        cards=cards,
+        site_style=SITE_STYLES[summary['site']],
+        manifest=build_cards_manifest(summary, cluster_ids, order, levels, explanations, url_mapping)
+    ).dump(out_fp, encoding='utf-8')
+
+# Cluster detail page stylesheet, written once to layout.css
+DETAIL_CSS = """
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; }
         
         /* Site Toggle Toolbar */
-        .site-toolbar {{ 
+        .site-toolbar { 
             background: #34495e; 
             padding: 1rem 2rem; 
             display: flex; 
             justify-content: space-between; 
             align-items: center;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .site-toggle {{ display: flex; gap: 0.5rem; }}
-        .site-btn {{ 
+        }
+        .site-toggle { display: flex; gap: 0.5rem; }
+        .site-btn { 
             padding: 0.75rem 1.5rem; 
             border: 2px solid white; 
             border-radius: 6px; 
@@ -1179,38 +913,38 @@ def generate_cluster_detail_page(cluster_id, screenshots, site, site_config):
             display: inline-block;
             background: transparent;
             color: white;
-        }}
-        .site-btn.active {{ 
+        }
+        .site-btn.active { 
             background: rgba(255, 255, 255, 0.2); 
             color: white; 
             border-color: white;
             box-shadow: 0 2px 8px rgba(0,0,0,0.3);
-        }}
-        .site-btn:not(.active) {{ 
+        }
+        .site-btn:not(.active) { 
             background: transparent; 
             color: white; 
             border-color: rgba(255, 255, 255, 0.7);
-        }}
-        .site-btn:hover:not(.active) {{ 
+        }
+        .site-btn:hover:not(.active) { 
             background: rgba(255, 255, 255, 0.1); 
             border-color: white;
             transform: translateY(-1px);
-        }}
-        .site-info {{ color: white; font-size: 0.9rem; opacity: 0.8; }}
+        }
+        .site-info { color: white; font-size: 0.9rem; opacity: 0.8; }
         
-        .header {{ 
-            background: {site_config['color']}; 
+        .header { 
+            background: var(--site-color); 
             color: white; 
             padding: 2rem; 
             text-align: center; 
-        }}
-        .header h1 {{ font-size: 2.5rem; margin-bottom: 0.5rem; }}
-        .header p {{ font-size: 1.1rem; opacity: 0.9; }}
+        }
+        .header h1 { font-size: 2.5rem; margin-bottom: 0.5rem; }
+        .header p { font-size: 1.1rem; opacity: 0.9; }
         
-        .container {{ max-width: 1600px; margin: 0 auto; padding: 3rem 2rem; }}
-        .back-link {{ margin-bottom: 3rem; }}
-        .back-btn {{ 
-            background: linear-gradient(135deg, {site_config['color']}, {site_config['color']}dd); 
+        .container { max-width: 1600px; margin: 0 auto; padding: 3rem 2rem; }
+        .back-link { margin-bottom: 3rem; }
+        .back-btn { 
+            background: linear-gradient(135deg, var(--site-color), var(--site-color-soft)); 
             color: white; 
             padding: 1rem 2.5rem; 
             text-decoration: none; 
@@ -1221,8 +955,8 @@ def generate_cluster_detail_page(cluster_id, screenshots, site, site_config):
             box-shadow: 0 8px 24px rgba(0,0,0,0.15);
             position: relative;
             overflow: hidden;
-        }}
-        .back-btn::before {{
+        }
+        .back-btn::before {
             content: '';
             position: absolute;
             top: 0;
@@ -1231,17 +965,17 @@ def generate_cluster_detail_page(cluster_id, screenshots, site, site_config):
             height: 100%;
             background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
             transition: left 0.5s;
-        }}
-        .back-btn:hover::before {{
+        }
+        .back-btn:hover::before {
             left: 100%;
-        }}
-        .back-btn:hover {{ 
+        }
+        .back-btn:hover { 
             transform: translateY(-2px);
             box-shadow: 0 12px 32px rgba(0,0,0,0.25);
-            background: linear-gradient(135deg, {site_config['color']}dd, {site_config['color']});
-        }}
+            background: linear-gradient(135deg, var(--site-color-soft), var(--site-color));
+        }
         
-        .cluster-info {{ 
+        .cluster-info { 
             background: linear-gradient(135deg, #ffffff, #f8f9fa); 
             padding: 3rem; 
             border-radius: 24px; 
@@ -1249,14 +983,14 @@ def generate_cluster_detail_page(cluster_id, screenshots, site, site_config):
             box-shadow: 0 8px 32px rgba(0,0,0,0.08);
             border: 1px solid rgba(255,255,255,0.2);
             backdrop-filter: blur(10px);
-        }}
-        .cluster-header {{ 
+        }
+        .cluster-header { 
             display: flex; 
             align-items: flex-start; 
             gap: 3rem; 
             margin-bottom: 2.5rem; 
-        }}
-        .canonical-image {{ 
+        }
+        .canonical-image { 
             width: 300px; 
             height: 220px; 
             object-fit: cover; 
@@ -1264,55 +998,55 @@ def generate_cluster_detail_page(cluster_id, screenshots, site, site_config):
             border: 2px solid rgba(0,0,0,0.05);
             transition: all 0.3s ease;
             box-shadow: 0 8px 24px rgba(0,0,0,0.1);
-        }}
-        .canonical-image:hover {{
+        }
+        .canonical-image:hover {
             transform: scale(1.05);
             box-shadow: 0 12px 32px rgba(0,0,0,0.15);
-        }}
-        .cluster-details h2 {{ 
+        }
+        .cluster-details h2 { 
             color: #1a1a1a; 
             margin-bottom: 1.5rem; 
             font-size: 2.2rem; 
             font-weight: 800;
             letter-spacing: -0.02em;
-        }}
-        .cluster-stats {{ 
+        }
+        .cluster-stats { 
             display: grid; 
             grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); 
             gap: 1.5rem; 
             margin-top: 2rem; 
-        }}
-        .stat-item {{ 
+        }
+        .stat-item { 
             text-align: center; 
             padding: 1.5rem;
             background: rgba(255,255,255,0.8);
             border-radius: 16px;
             border: 1px solid rgba(0,0,0,0.05);
             transition: all 0.3s ease;
-        }}
-        .stat-item:hover {{
+        }
+        .stat-item:hover {
             transform: translateY(-4px);
             box-shadow: 0 8px 24px rgba(0,0,0,0.1);
-        }}
-        .stat-number {{ 
+        }
+        .stat-number { 
             font-size: 2rem; 
             font-weight: 800; 
-            color: {site_config['color']}; 
+            color: var(--site-color); 
             margin-bottom: 0.5rem;
             letter-spacing: -0.02em;
-        }}
-        .stat-label {{ 
+        }
+        .stat-label { 
             color: #6c757d; 
             font-size: 1rem; 
             font-weight: 600;
-        }}
+        }
         
-        .images-grid {{ 
+        .images-grid { 
             display: grid; 
             grid-template-columns: repeat(auto-fill, minmax(380px, 1fr)); 
             gap: 2rem; 
-        }}
-        .image-card {{ 
+        }
+        .image-card { 
             background: linear-gradient(135deg, #ffffff, #f8f9fa); 
             border-radius: 20px; 
             overflow: hidden; 
@@ -1321,36 +1055,36 @@ def generate_cluster_detail_page(cluster_id, screenshots, site, site_config):
             border: 1px solid rgba(255,255,255,0.2);
             backdrop-filter: blur(10px);
             position: relative;
-        }}
-        .image-card:hover {{ 
+        }
+        .image-card:hover { 
             transform: translateY(-6px) scale(1.02); 
             box-shadow: 0 16px 48px rgba(0,0,0,0.15);
             border-color: rgba(0,0,0,0.1);
-        }}
-        .image-card img {{ 
+        }
+        .image-card img { 
             width: 100%; 
             height: 240px; 
             object-fit: cover; 
             cursor: pointer; 
             transition: all 0.3s ease; 
-        }}
-        .image-card:hover img {{ 
+        }
+        .image-card:hover img { 
             transform: scale(1.05);
-        }}
-        .image-info {{ 
+        }
+        .image-info { 
             padding: 2rem; 
             background: linear-gradient(180deg, #ffffff 0%, #fafbfc 100%);
-        }}
-        .image-name {{ 
+        }
+        .image-name { 
             font-weight: 700; 
             color: #1a1a1a; 
             margin-bottom: 1rem; 
             word-break: break-word; 
             line-height: 1.5;
             font-size: 1.1rem;
-        }}
-        .canonical-badge {{ 
-            background: linear-gradient(135deg, {site_config['color']}, {site_config['color']}dd); 
+        }
+        .canonical-badge { 
+            background: linear-gradient(135deg, var(--site-color), var(--site-color-soft)); 
             color: white; 
             padding: 0.5rem 1rem; 
             border-radius: 12px; 
@@ -1358,16 +1092,16 @@ def generate_cluster_detail_page(cluster_id, screenshots, site, site_config):
             margin-left: 0.75rem; 
             font-weight: 600;
             box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-        }}
-        .image-distance {{ 
+        }
+        .image-distance { 
             color: #6c757d; 
             font-size: 1rem; 
             margin-bottom: 1rem; 
             font-weight: 500;
-        }}
+        }
         
         /* URL link styles */
-        .image-url-link {{
+        .image-url-link {
             display: inline-block;
             padding: 0.5rem 0.75rem;
             background: #f8f9fa;
@@ -1382,201 +1116,185 @@ def generate_cluster_detail_page(cluster_id, screenshots, site, site_config):
             text-overflow: ellipsis;
             white-space: nowrap;
             margin-top: 0.5rem;
-        }}
-        .image-url-link:hover {{
+        }
+        .image-url-link:hover {
             background: #e9ecef;
             color: #212529;
             border-color: #dee2e6;
             text-decoration: none;
-        }}
-        .url-icon {{
+        }
+        .url-icon {
             margin-right: 0.5rem;
             opacity: 0.7;
-        }}
-        
-        /* Modal/Lightbox styles */
-        .modal {{ display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.9); }}
-        .modal-content {{ margin: auto; display: block; max-width: 90%; max-height: 90%; margin-top: 2%; }}
-        .modal-close {{ position: absolute; top: 15px; right: 35px; color: #f1f1f1; font-size: 40px; font-weight: bold; cursor: pointer; }}
-        .modal-close:hover {{ color: #bbb; }}
-    </style>
-</head>
-<body>
-    <!-- Site Toggle Toolbar -->
-    <div class="site-toolbar">
-        <div class="site-toggle">
-            <a href="{'index.html' if site == 'folklife' else f'index_{site}.html'}" class="site-btn{' active' if site == 'folklife' else ''}">
-                {SITE_CONFIGS['folklife']['display_name']}
-            </a>
-            <a href="{'index.html' if site == 'festival' else f'index_{site}.html'}" class="site-btn{' active' if site == 'festival' else ''}">
-                {SITE_CONFIGS['festival']['display_name']}
-            </a>
-        </div>
-        <div class="site-info">
-            Currently viewing: {site_config['display_name']}
-        </div>
-    </div>
-    
-    <div class="header">
-        <h1>{site_config['display_name']} - Layout {cluster_id}</h1>
-        <p>Detailed view of {len(screenshots)} screenshots in this layout cluster</p>
-    </div>
-    
-    <div class="container">
-        <div class="back-link">
-            <a href="{'index.html' if site == 'folklife' else f'index_{site}.html'}" class="back-btn">← Back to All Layouts</a>
-        </div>
-        
-        <div class="cluster-info">
-            <div class="cluster-header">
-                <img src="{SPACES_CDN_BASE}/{site}/{canonical['filename']}" alt="Canonical" class="canonical-image clickable" 
-                     onclick="openModal('{canonical['filename']}', '{site}')">
-                <div class="cluster-details">
-                    <h2>Layout {cluster_id}</h2>"""
-    
-    # Add URL link for canonical image if available
-    canonical_url = url_mapping.get(canonical['filename'], '')
-    if canonical_url:
-        html += f"""
-                    <a href="{canonical_url}" target="_blank" class="image-url-link">
-                        <span class="url-icon">🔗</span>View Source Page
-                    </a>"""
-    
-    html += f"""
-                    
-                    <div class="cluster-stats">
-                        <div class="stat-item">
-                            <div class="stat-number">{len(screenshots)}</div>
-                            <div class="stat-label">Total Screenshots</div>
-                        </div>
-                        <div class="stat-item">
-                            <div class="stat-number">{len(screenshots)}</div>
-                            <div class="stat-label">Images in Layout</div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="images-grid">"""
-    
-    for screenshot in sorted_screenshots:
-        similarity = 100 - (screenshot['distance'] * 100)
-        
-        html += f"""
-            <div class="image-card">
-                <img src="{SPACES_CDN_BASE}/{site}/{screenshot['filename']}" alt="{screenshot['filename']}" 
-                     onclick="openModal('{screenshot['filename']}', '{site}')">
-                <div class="image-info">
-                    <div class="image-name">
-                        {screenshot['filename']}"""
-        
-        if screenshot['canonical']:
-            html += f"""
-                        <span class="canonical-badge">Canonical</span>"""
-        
-        html += f"""
-                    </div>
-                    <div class="image-distance">
-                        Similarity: {similarity:.1f}%
-                    </div>"""
-        
-        # Add URL link if available
-        screenshot_url = url_mapping.get(screenshot['filename'], '')
-        if screenshot_url:
-            html += f"""
-                    <a href="{screenshot_url}" target="_blank" class="image-url-link">
-                        <span class="url-icon">🔗</span>View Source Page
-                    </a>"""
-        
-        html += f"""
-                </div>
-            </div>"""
-    
-    html += """
-        </div>
-    </div>
-    
-    <!-- Modal for full-size images -->
-    <div id="imageModal" class="modal">
-        <span class="modal-close" onclick="closeModal()">&times;</span>
-        <img class="modal-content" id="modalImage">
-        <div id="modalCaption" style="text-align: center; color: white; margin-top: 1rem; font-size: 1.1rem;"></div>
-    </div>
-    
-    <script>
-        function openModal(filename, site) {
-            const modal = document.getElementById('imageModal');
-            const modalImg = document.getElementById('modalImage');
-            const caption = document.getElementById('modalCaption');
-            
-            modal.style.display = 'block';
-            modalImg.src = 'https://quotient.nyc3.cdn.digitaloceanspaces.com/' + site + '/' + filename;
-            caption.innerHTML = filename;
-        }
-        
-        function closeModal() {
-            document.getElementById('imageModal').style.display = 'none';
-        }
-        
-        // Close modal when clicking outside the image
-        window.onclick = function(event) {
-            const modal = document.getElementById('imageModal');
-            if (event.target === modal) {
-                modal.style.display = 'none';
-            }
         }
         
-        // Close modal with Escape key
-        document.addEventListener('keydown', function(event) {
-            if (event.key === 'Escape') {
-                closeModal();
-            }
-        });
-    </script>
-</body>
-</html>"""
-    
-    return html
+        /* Modal/Lightbox styles */
+        .modal { display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.9); }
+        .modal-content { margin: auto; display: block; max-width: 90%; max-height: 90%; margin-top: 2%; }
+        .modal-close { position: absolute; top: 15px; right: 35px; color: #f1f1f1; font-size: 40px; font-weight: bold; cursor: pointer; }
+        .modal-close:hover { color: #bbb; }
+"""
+
+def generate_cluster_detail_page(cluster_id, screenshots, site, site_config, url_mapping):
+    """Generate a detailed page for a specific cluster, as a stream of HTML fragments"""
+    return DETAIL_TEMPLATE.generate(
+        cluster_id=cluster_id,
+        screenshots=screenshots,
+        site=site,
+        site_config=site_config,
+        site_configs=SITE_CONFIGS,
+        cdn=CDN_PREFIXES[site],
+        site_style=SITE_STYLES[site],
+        url_mapping=url_mapping
+    )
+
+# Per-site accent colour, set inline on every page for the shared sheets' CSS variables
+SITE_STYLES = {
+    site: f"<style>:root {{ --site-color: {site_config['color']}; --site-color-soft: {site_config['color']}dd; }}</style>"
+    for site, site_config in SITE_CONFIGS.items()
+}
+
+def precompress(output_file):
+    """Write .gz (and .br when brotli is available) copies next to a generated file"""
+    if not EMIT_GZIP:
+        return
+    # Plain string paths: this runs once per page, so skip PurePath construction
+    output_file = os.fspath(output_file)
+    with open(output_file, 'rb') as f:
+        data = f.read()
+    with open(output_file + '.gz', 'wb') as f:
+        # mtime=0 keeps the .gz byte-identical across rebuilds of an unchanged page
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(output_file + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+def write_shared_css(output_dir):
+    """Write the site-independent stylesheets shared by every page"""
+    for name, css in (('styles.css', MAIN_CSS), ('layout.css', DETAIL_CSS)):
+        (output_dir / name).write_text(css, encoding='utf-8')
+        precompress(output_dir / name)
+
+def _render_and_write(task):
+    """Render one cluster detail page and write it to disk (runs in a worker process)"""
+    cluster_id, screenshots, site, site_config, url_mapping, output_file = task
+    with open(output_file, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE) as f:
+        f.writelines(generate_cluster_detail_page(cluster_id, screenshots, site, site_config, url_mapping))
+    precompress(output_file)
+    return output_file
+
+# Salt for page hashes, so edits to this file or the detail template invalidate every cached page
+_SOURCE_HASH = hashlib.blake2b(
+    Path(__file__).read_bytes() + Path(DETAIL_TEMPLATE.filename).read_bytes(), digest_size=16
+).digest()
+
+def cluster_page_hash(screenshots, url_mapping):
+    """Hash the inputs a cluster detail page is rendered from"""
+    h = hashlib.blake2b(_SOURCE_HASH, digest_size=16)
+    h.update(repr((screenshots, url_mapping)).encode('utf-8'))
+    return h.hexdigest()
+
+def load_page_cache(site):
+    """Load the {cluster_id: page_hash} cache from the previous run"""
+    try:
+        return _json.loads((CACHE_DIR / f'{site}_pages.json').read_bytes())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Warning: ignoring unreadable page cache for {site}: {e}")
+        return {}
+
+def save_page_cache(site, cache):
+    """Store the {cluster_id: page_hash} cache for the next run"""
+    data = _json.dumps(cache)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    # Write a temp file and swap it in, so an interrupted run never leaves a truncated cache
+    CACHE_DIR.mkdir(exist_ok=True)
+    cache_file = CACHE_DIR / f'{site}_pages.json'
+    tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+    tmp_file.write_bytes(data)
+    os.replace(tmp_file, cache_file)
+
+def load_cluster_cache(site, cache_key):
+    """Load the parsed clusters stored by the previous run, if they match cache_key"""
+    try:
+        with open(CACHE_DIR / f'{site}_clusters.pickle', 'rb') as f:
+            key, clusters = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: ignoring unreadable cluster cache for {site}: {e}")
+        return None
+    return clusters if key == cache_key else None
+
+def save_cluster_cache(site, cache_key, clusters):
+    """Store the parsed clusters for the next run"""
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        with open(CACHE_DIR / f'{site}_clusters.pickle', 'wb') as f:
+            pickle.dump((cache_key, clusters), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Warning: could not write cluster cache for {site}: {e}")
 
 def main():
     """Main execution function"""
     # Ensure output directory exists
     OUTPUT_DIR.mkdir(exist_ok=True)
     
-    # Generate pages for each site
-    for site_name in SITE_CONFIGS:
-        print(f"Generating site: {site_name}")
-        
-        # Load cluster data
-        clusters = load_cluster_data(site_name)
-        if clusters is None:
-            continue
-        
-        # Generate summary
-        summary = get_cluster_summary(clusters, site_name)
-        
-        # Generate main index page
-        main_html = generate_main_page(summary, SITE_CONFIGS)
-        
-        # Save main page
-        if site_name == 'folklife':
-            output_file = OUTPUT_DIR / 'index.html'
-        else:
-            output_file = OUTPUT_DIR / f'index_{site_name}.html'
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(main_html)
-        print(f"Generated: {output_file}")
-        
-        # Generate cluster detail pages
-        for cluster_id, screenshots in clusters.items():
-            detail_html = generate_cluster_detail_page(cluster_id, screenshots, site_name, SITE_CONFIGS[site_name])
+    # Stylesheets are shared by every page, so they are written once up front
+    write_shared_css(OUTPUT_DIR)
+    # Per-page paths are built as plain strings rather than Path objects
+    output_dir = os.fspath(OUTPUT_DIR)
+    
+    # Detail pages are independent and CPU-bound, so render them in worker processes
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        # Generate pages for each site
+        for site_name in SITE_CONFIGS:
+            print(f"Generating site: {site_name}")
+            
+            # Load cluster data
+            clusters = load_cluster_data(site_name)
+            if clusters is None:
+                continue
+            
+            # Load the URL mapping once and share it across every page for this site
+            url_mapping = load_url_mapping(site_name)
             
-            output_file = OUTPUT_DIR / f'layout_{site_name}_{cluster_id}.html'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(detail_html)
+            # Generate summary
+            summary = get_cluster_summary(clusters, site_name)
+            
+            # Generate and save main index page
+            if site_name == 'folklife':
+                output_file = OUTPUT_DIR / 'index.html'
+            else:
+                output_file = OUTPUT_DIR / f'index_{site_name}.html'
+            
+            with open(output_file, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                generate_main_page(summary, SITE_CONFIGS, url_mapping, f)
+            precompress(output_file)
             print(f"Generated: {output_file}")
+            
+            # Generate cluster detail pages, shipping each worker only the URLs its cluster needs
+            # and skipping pages whose inputs are unchanged since the last run
+            cache = load_page_cache(site_name)
+            new_cache = {}
+            tasks = []
+            page_prefix = os.path.join(output_dir, f'layout_{site_name}_')
+            for cluster_id, screenshots in clusters.items():
+                cluster_urls = {s['filename']: url_mapping[s['filename']] for s in screenshots if s['filename'] in url_mapping}
+                output_file = f'{page_prefix}{cluster_id}.html'
+                new_cache[cluster_id] = page_hash = cluster_page_hash(screenshots, cluster_urls)
+                # A page built with EMIT_GZIP=0 has no .gz yet, so re-render it once gzip is back on
+                if (cache.get(cluster_id) == page_hash and os.path.exists(output_file)
+                        and (not EMIT_GZIP or os.path.exists(output_file + '.gz'))):
+                    continue
+                tasks.append((cluster_id, screenshots, site_name, SITE_CONFIGS[site_name], cluster_urls, output_file))
+            
+            for output_file in executor.map(_render_and_write, tasks, chunksize=16):
+                print(f"Generated: {output_file}")
+            print(f"Unchanged: {len(clusters) - len(tasks)} layout pages for {site_name}")
+            save_page_cache(site_name, new_cache)
     
     print("Site generation complete!")
 
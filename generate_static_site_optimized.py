@@ -5,11 +5,16 @@ Includes proper caching headers, CDN optimization, and performance improvements
 """
 
 import os
+import sys
 import csv
 import json
 import base64
+import functools
+import gzip
+import hashlib
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 try:
     from PIL import Image
     import io
@@ -24,6 +29,9 @@ CSV_FILE = Path("layout_clusters_final.csv")
 THUMBNAIL_SIZE = (300, 225)
 MAX_IMAGES_PER_CLUSTER = 20
 OUTPUT_DIR = Path("static_site_optimized")
+CACHE_DIR = Path(".cache")  # build caches stay outside the uploaded output directory
+WRITE_BUFFER_SIZE = 1 << 20  # pages are streamed to disk through a 1 MiB buffer
+EMIT_GZIP = os.environ.get('EMIT_GZIP', '1') != '0'  # EMIT_GZIP=0 skips .gz copies for quick local builds
 
 # CDN Configuration - Choose your preferred option
 CDN_CONFIGS = {
@@ -57,15 +65,20 @@ def load_cluster_data():
         return None
     
     clusters = defaultdict(list)
-    with open(CSV_FILE, 'r') as f:
-        reader = csv.DictReader(f)
+    with open(CSV_FILE, 'r', newline='') as f:
+        # Positional reader: locate the columns once instead of building a dict per row
+        reader = csv.reader(f)
+        header = next(reader)
+        i_id, i_fn, i_path, i_can, i_dist = (
+            header.index(name)
+            for name in ('cluster_id', 'filename', 'path', 'canonical', 'distance_to_canonical')
+        )
         for row in reader:
-            cluster_id = row['cluster_id']
-            clusters[cluster_id].append({
-                'filename': row['filename'],
-                'path': row['path'],
-                'canonical': row['canonical'] == 'True',
-                'distance': float(row['distance_to_canonical'])
+            clusters[row[i_id]].append({
+                'filename': sys.intern(row[i_fn]),
+                'path': row[i_path],
+                'canonical': row[i_can] == 'True',
+                'distance': float(row[i_dist])
             })
     
     return clusters
@@ -88,6 +101,8 @@ def create_thumbnail_url(filename, size=THUMBNAIL_SIZE):
     
     return f"{base_url}/{filename}"
 
+# The CDN choice is fixed for a run, so both head blocks are built once and reused by every page
+@functools.lru_cache(maxsize=1)
 def get_cache_headers():
     """Get appropriate cache headers based on CDN configuration"""
     if not CDN_CONFIG.get("cache_headers"):
@@ -103,8 +118,7 @@ def get_cache_headers():
     
     # Add preload hints for critical resources
     headers.append("""
-    <link rel="preload" href="/static/css/main.css" as="style">
-    <link rel="preload" href="/static/js/main.js" as="script">
+    <link rel="preload" href="js/app.js" as="script">
     """)
     
     # Add resource hints for CDN
@@ -117,8 +131,9 @@ def get_cache_headers():
     
     return "\n".join(headers)
 
+@functools.lru_cache(maxsize=1)
 def get_performance_optimizations():
-    """Get performance optimization scripts and styles"""
+    """Get the inline critical CSS (the lazy-loading script is in js/app.js)"""
     return """
     <style>
         /* Critical CSS - inline for performance */
@@ -153,8 +168,88 @@ def get_performance_optimizations():
             scroll-behavior: smooth;
         }
     </style>
-    
-    <script>
+    """
+
+# Page stylesheets and the shared script, written once by write_static_assets() instead of inlined in every page;
+# the CDN base is interpolated into the modal script once, here
+MAIN_CSS = """
+        .header { background: #2c3e50; color: white; padding: 2rem; text-align: center; }
+        .header h1 { font-size: 2.5rem; margin-bottom: 1rem; }
+        .header p { font-size: 1.2rem; opacity: 0.9; }
+        
+        .stats { display: flex; justify-content: center; gap: 3rem; margin: 2rem 0; }
+        .stat-item { text-align: center; }
+        .stat-number { font-size: 2.5rem; font-weight: bold; color: #2c3e50; }
+        .stat-label { color: #7f8c8d; margin-top: 0.5rem; }
+        
+        .container { max-width: 1200px; margin: 0 auto; padding: 2rem; }
+        
+        .clusters-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(350px, 1fr)); gap: 2rem; }
+        
+        .cluster-card { background: white; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); overflow: hidden; }
+        .cluster-header { padding: 1.5rem; border-bottom: 1px solid #ecf0f1; }
+        .cluster-title { font-size: 1.3rem; font-weight: bold; color: #2c3e50; }
+        .cluster-size { color: #7f8c8d; margin-top: 0.5rem; }
+        
+        .cluster-content { padding: 1.5rem; }
+        
+        .canonical-section { margin-bottom: 1.5rem; }
+        .canonical-section h3 { color: #2c3e50; margin-bottom: 1rem; }
+        .canonical-thumbnail { width: 100%; height: 150px; object-fit: cover; border-radius: 4px; cursor: pointer; transition: opacity 0.2s; }
+        .canonical-thumbnail:hover { opacity: 0.8; }
+        
+        .preview-grid { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.5rem; }
+        .preview-thumb { width: 100%; height: 40px; object-fit: cover; border-radius: 4px; cursor: pointer; transition: opacity 0.2s; }
+        .preview-thumb:hover { opacity: 0.8; }
+        
+        .view-all { text-align: center; margin-top: 1rem; }
+        .view-all a { display: inline-block; padding: 0.75rem 1.5rem; background: #3498db; color: white; text-decoration: none; border-radius: 4px; transition: background 0.2s; }
+        .view-all a:hover { background: #2980b9; }
+        
+        /* Modal/Lightbox styles */
+        .modal { display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.9); }
+        .modal-content { margin: auto; display: block; max-width: 90%; max-height: 90%; margin-top: 2%; }
+        .modal-close { position: absolute; top: 15px; right: 35px; color: #f1f1f1; font-size: 40px; font-weight: bold; cursor: pointer; }
+        .modal-close:hover { color: #bbb; }
+        
+        /* Loading states */
+        .loading { opacity: 0.6; }
+        .loaded { opacity: 1; }
+"""
+
+DETAIL_CSS = """
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; }
+        
+        .header { background: #2c3e50; color: white; padding: 2rem; text-align: center; }
+        .header h1 { font-size: 2.5rem; margin-bottom: 1rem; }
+        .header p { font-size: 1.2rem; opacity: 0.9; }
+        
+        .back-link { text-align: center; margin: 2rem 0; }
+        .back-link a { display: inline-block; padding: 0.75rem 1.5rem; background: #3498db; color: white; text-decoration: none; border-radius: 4px; transition: background 0.2s; }
+        .back-link a:hover { background: #2980b9; }
+        
+        .container { max-width: 1200px; margin: 0 auto; padding: 2rem; }
+        
+        .canonical-section { background: white; border-radius: 8px; padding: 2rem; margin-bottom: 2rem; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .canonical-section h2 { color: #2c3e50; margin-bottom: 1rem; }
+        .canonical-image { width: 100%; max-width: 800px; height: auto; border-radius: 8px; cursor: pointer; transition: opacity 0.2s; }
+        .canonical-image:hover { opacity: 0.9; }
+        
+        .screenshots-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 1rem; }
+        .screenshot-item { background: white; border-radius: 8px; padding: 1rem; box-shadow: 0 2px 10px rgba(0,0,0,0.1); text-align: center; }
+        .screenshot-thumb { width: 100%; height: 150px; object-fit: cover; border-radius: 4px; cursor: pointer; transition: opacity 0.2s; }
+        .screenshot-thumb:hover { opacity: 0.8; }
+        .screenshot-filename { margin-top: 0.5rem; font-size: 0.9rem; color: #7f8c8d; word-break: break-word; }
+        
+        /* Modal/Lightbox styles */
+        .modal { display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.9); }
+        .modal-content { margin: auto; display: block; max-width: 90%; max-height: 90%; margin-top: 2%; }
+        .modal-close { position: absolute; top: 15px; right: 35px; color: #f1f1f1; font-size: 40px; font-weight: bold; cursor: pointer; }
+        .modal-close:hover { color: #bbb; }
+"""
+
+APP_JS = """
         // Lazy loading implementation
         document.addEventListener('DOMContentLoaded', function() {
             const lazyImages = document.querySelectorAll('.lazy-image');
@@ -194,15 +289,44 @@ def get_performance_optimizations():
         } else {
             preloadCriticalImages();
         }
-    </script>
-    """
+        
+        function openModal(filename) {
+            const modal = document.getElementById('imageModal');
+            const modalImg = document.getElementById('modalImage');
+            const caption = document.getElementById('modalCaption');
+            
+            modal.style.display = 'block';
+            modalImg.src = '""" + CDN_CONFIG["base_url"] + """/' + filename;
+            caption.innerHTML = filename;
+        }
+        
+        function closeModal() {
+            document.getElementById('imageModal').style.display = 'none';
+        }
+        
+        // Close modal when clicking outside the image
+        window.onclick = function(event) {
+            const modal = document.getElementById('imageModal');
+            if (event.target === modal) {
+                modal.style.display = 'none';
+            }
+        }
+        
+        // Close modal with Escape key
+        document.addEventListener('keydown', function(event) {
+            if (event.key === 'Escape') {
+                closeModal();
+            }
+        });
+"""
 
 def generate_main_page(clusters, summary):
-    """Generate the main overview page with optimizations"""
+    """Generate the main overview page with optimizations, as a stream of HTML fragments"""
     cache_headers = get_cache_headers()
     performance_opt = get_performance_optimizations()
     
-    html = f"""<!DOCTYPE html>
+    # Yield fragments so the caller can stream the page straight to disk
+    yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -217,50 +341,8 @@ def generate_main_page(clusters, summary):
     <!-- Performance Optimizations -->
     {performance_opt}
     
-    <style>
-        .header {{ background: #2c3e50; color: white; padding: 2rem; text-align: center; }}
-        .header h1 {{ font-size: 2.5rem; margin-bottom: 1rem; }}
-        .header p {{ font-size: 1.2rem; opacity: 0.9; }}
-        
-        .stats {{ display: flex; justify-content: center; gap: 3rem; margin: 2rem 0; }}
-        .stat-item {{ text-align: center; }}
-        .stat-number {{ font-size: 2.5rem; font-weight: bold; color: #2c3e50; }}
-        .stat-label {{ color: #7f8c8d; margin-top: 0.5rem; }}
-        
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 2rem; }}
-        
-        .clusters-grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(350px, 1fr)); gap: 2rem; }}
-        
-        .cluster-card {{ background: white; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); overflow: hidden; }}
-        .cluster-header {{ padding: 1.5rem; border-bottom: 1px solid #ecf0f1; }}
-        .cluster-title {{ font-size: 1.3rem; font-weight: bold; color: #2c3e50; }}
-        .cluster-size {{ color: #7f8c8d; margin-top: 0.5rem; }}
-        
-        .cluster-content {{ padding: 1.5rem; }}
-        
-        .canonical-section {{ margin-bottom: 1.5rem; }}
-        .canonical-section h3 {{ color: #2c3e50; margin-bottom: 1rem; }}
-        .canonical-thumbnail {{ width: 100%; height: 150px; object-fit: cover; border-radius: 4px; cursor: pointer; transition: opacity 0.2s; }}
-        .canonical-thumbnail:hover {{ opacity: 0.8; }}
-        
-        .preview-grid {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.5rem; }}
-        .preview-thumb {{ width: 100%; height: 40px; object-fit: cover; border-radius: 4px; cursor: pointer; transition: opacity 0.2s; }}
-        .preview-thumb:hover {{ opacity: 0.8; }}
-        
-        .view-all {{ text-align: center; margin-top: 1rem; }}
-        .view-all a {{ display: inline-block; padding: 0.75rem 1.5rem; background: #3498db; color: white; text-decoration: none; border-radius: 4px; transition: background 0.2s; }}
-        .view-all a:hover {{ background: #2980b9; }}
-        
-        /* Modal/Lightbox styles */
-        .modal {{ display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.9); }}
-        .modal-content {{ margin: auto; display: block; max-width: 90%; max-height: 90%; margin-top: 2%; }}
-        .modal-close {{ position: absolute; top: 15px; right: 35px; color: #f1f1f1; font-size: 40px; font-weight: bold; cursor: pointer; }}
-        .modal-close:hover {{ color: #bbb; }}
-        
-        /* Loading states */
-        .loading {{ opacity: 0.6; }}
-        .loaded {{ opacity: 1; }}
-    </style>
+    <link rel="stylesheet" href="css/main.css">
+    <script src="js/app.js" defer></script>
 </head>
 <body>
     <div class="header">
@@ -282,14 +364,15 @@ def generate_main_page(clusters, summary):
     <div class="container">
         <div class="clusters-grid">"""
     
-    # Sort clusters by size for better UX
-    sorted_clusters = sorted(clusters.items(), key=lambda x: len(x[1]), reverse=True)
-    
-    for cluster_id, screenshots in sorted_clusters:
+    # Clusters largest first for better UX (sorted once in get_cluster_summary)
+    for cluster_id in summary['sorted_cluster_ids']:
+        screenshots = clusters[cluster_id]
         canonical = next((s for s in screenshots if s['canonical']), screenshots[0])
+        canonical_name = canonical['filename']
+        canonical_thumb = create_thumbnail_url(canonical_name, THUMBNAIL_SIZE)
         preview_images = screenshots[:8]  # Show first 8 images
         
-        html += f"""
+        yield f"""
             <div class="cluster-card">
                 <div class="cluster-header">
                     <div class="cluster-title">Layout {cluster_id}</div>
@@ -299,27 +382,30 @@ def generate_main_page(clusters, summary):
                 <div class="cluster-content">
                     <div class="canonical-section">
                         <h3>Canonical Image</h3>
-                        <img src="{create_thumbnail_url(canonical['filename'], THUMBNAIL_SIZE)}" 
-                             alt="{canonical['filename']}" 
+                        <img src="{canonical_thumb}" 
+                             alt="{canonical_name}" 
                              class="canonical-thumbnail lazy-image"
-                             data-src="{create_thumbnail_url(canonical['filename'], THUMBNAIL_SIZE)}"
-                             onclick="openModal('{canonical['filename']}')">
-                        <p><strong>{canonical['filename']}</strong></p>
+                             data-src="{canonical_thumb}"
+                             onclick="openModal('{canonical_name}')">
+                        <p><strong>{canonical_name}</strong></p>
                         <p>This image represents the standard layout for this layout group.</p>
                     </div>
                     
                     <div class="preview-grid">"""
         
         for screenshot in preview_images:
-            html += f"""
-                        <img src="{create_thumbnail_url(screenshot['filename'], (40, 40))}" 
-                             alt="{screenshot['filename']}" 
+            # Look up the filename and build its CDN URL once per image
+            name = screenshot['filename']
+            thumb = create_thumbnail_url(name, (40, 40))
+            yield f"""
+                        <img src="{thumb}" 
+                             alt="{name}" 
                              class="preview-thumb lazy-image"
-                             data-src="{create_thumbnail_url(screenshot['filename'], (40, 40))}"
-                             title="{screenshot['filename']}" 
-                             onclick="openModal('{screenshot['filename']}')">"""
+                             data-src="{thumb}"
+                             title="{name}" 
+                             onclick="openModal('{name}')">"""
         
-        html += f"""
+        yield f"""
                     </div>
                     
                     <div class="view-all">
@@ -328,7 +414,7 @@ def generate_main_page(clusters, summary):
                 </div>
             </div>"""
     
-    html += """
+    yield """
         </div>
     </div>
     
@@ -340,35 +426,6 @@ def generate_main_page(clusters, summary):
     </div>
     
     <script>
-        function openModal(filename) {
-            const modal = document.getElementById('imageModal');
-            const modalImg = document.getElementById('modalImage');
-            const caption = document.getElementById('modalCaption');
-            
-            modal.style.display = 'block';
-            modalImg.src = '""" + CDN_CONFIG["base_url"] + """/' + filename;
-            caption.innerHTML = filename;
-        }
-        
-        function closeModal() {
-            document.getElementById('imageModal').style.display = 'none';
-        }
-        
-        // Close modal when clicking outside the image
-        window.onclick = function(event) {
-            const modal = document.getElementById('imageModal');
-            if (event.target === modal) {
-                modal.style.display = 'none';
-            }
-        }
-        
-        // Close modal with Escape key
-        document.addEventListener('keydown', function(event) {
-            if (event.key === 'Escape') {
-                closeModal();
-            }
-        });
-        
         // Performance monitoring
         window.addEventListener('load', function() {
             if ('performance' in window) {
@@ -380,16 +437,17 @@ def generate_main_page(clusters, summary):
 </body>
 </html>"""
     
-    return html
 
 def generate_cluster_detail_page(cluster_id, screenshots):
-    """Generate individual cluster detail page with optimizations"""
+    """Generate individual cluster detail page with optimizations, as a stream of HTML fragments"""
     cache_headers = get_cache_headers()
     performance_opt = get_performance_optimizations()
     
     canonical = next((s for s in screenshots if s['canonical']), screenshots[0])
+    canonical_name = canonical['filename']
+    canonical_thumb = create_thumbnail_url(canonical_name)
     
-    html = f"""<!DOCTYPE html>
+    yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -403,37 +461,8 @@ def generate_cluster_detail_page(cluster_id, screenshots):
     <!-- Performance Optimizations -->
     {performance_opt}
     
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; }}
-        
-        .header {{ background: #2c3e50; color: white; padding: 2rem; text-align: center; }}
-        .header h1 {{ font-size: 2.5rem; margin-bottom: 1rem; }}
-        .header p {{ font-size: 1.2rem; opacity: 0.9; }}
-        
-        .back-link {{ text-align: center; margin: 2rem 0; }}
-        .back-link a {{ display: inline-block; padding: 0.75rem 1.5rem; background: #3498db; color: white; text-decoration: none; border-radius: 4px; transition: background 0.2s; }}
-        .back-link a:hover {{ background: #2980b9; }}
-        
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 2rem; }}
-        
-        .canonical-section {{ background: white; border-radius: 8px; padding: 2rem; margin-bottom: 2rem; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .canonical-section h2 {{ color: #2c3e50; margin-bottom: 1rem; }}
-        .canonical-image {{ width: 100%; max-width: 800px; height: auto; border-radius: 8px; cursor: pointer; transition: opacity 0.2s; }}
-        .canonical-image:hover {{ opacity: 0.9; }}
-        
-        .screenshots-grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 1rem; }}
-        .screenshot-item {{ background: white; border-radius: 8px; padding: 1rem; box-shadow: 0 2px 10px rgba(0,0,0,0.1); text-align: center; }}
-        .screenshot-thumb {{ width: 100%; height: 150px; object-fit: cover; border-radius: 4px; cursor: pointer; transition: opacity 0.2s; }}
-        .screenshot-thumb:hover {{ opacity: 0.8; }}
-        .screenshot-filename {{ margin-top: 0.5rem; font-size: 0.9rem; color: #7f8c8d; word-break: break-word; }}
-        
-        /* Modal/Lightbox styles */
-        .modal {{ display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.9); }}
-        .modal-content {{ margin: auto; display: block; max-width: 90%; max-height: 90%; margin-top: 2%; }}
-        .modal-close {{ position: absolute; top: 15px; right: 35px; color: #f1f1f1; font-size: 40px; font-weight: bold; cursor: pointer; }}
-        .modal-close:hover {{ color: #bbb; }}
-    </style>
+    <link rel="stylesheet" href="css/layout.css">
+    <script src="js/app.js" defer></script>
 </head>
 <body>
     <div class="header">
@@ -449,28 +478,30 @@ def generate_cluster_detail_page(cluster_id, screenshots):
         <div class="canonical-section">
             <h2>Canonical Layout</h2>
             <p>This image represents the standard layout for this group:</p>
-            <img src="{create_thumbnail_url(canonical['filename'])}" 
-                 alt="{canonical['filename']}" 
+            <img src="{canonical_thumb}" 
+                 alt="{canonical_name}" 
                  class="canonical-image lazy-image"
-                 data-src="{create_thumbnail_url(canonical['filename'])}"
-                 onclick="openModal('{canonical['filename']}')">
-            <p><strong>{canonical['filename']}</strong></p>
+                 data-src="{canonical_thumb}"
+                 onclick="openModal('{canonical_name}')">
+            <p><strong>{canonical_name}</strong></p>
         </div>
         
         <div class="screenshots-grid">"""
     
     for screenshot in screenshots:
-        html += f"""
+        name = screenshot['filename']
+        thumb = create_thumbnail_url(name, (200, 150))
+        yield f"""
             <div class="screenshot-item">
-                <img src="{create_thumbnail_url(screenshot['filename'], (200, 150))}" 
-                     alt="{screenshot['filename']}" 
+                <img src="{thumb}" 
+                     alt="{name}" 
                      class="screenshot-thumb lazy-image"
-                     data-src="{create_thumbnail_url(screenshot['filename'], (200, 150))}"
-                     onclick="openModal('{screenshot['filename']}')">
-                <div class="screenshot-filename">{screenshot['filename']}</div>
+                     data-src="{thumb}"
+                     onclick="openModal('{name}')">
+                <div class="screenshot-filename">{name}</div>
             </div>"""
     
-    html += f"""
+    yield """
         </div>
     </div>
     
@@ -480,50 +511,76 @@ def generate_cluster_detail_page(cluster_id, screenshots):
         <img class="modal-content" id="modalImage">
         <div id="modalCaption" style="text-align: center; color: white; margin-top: 1rem; font-size: 1.1rem;"></div>
     </div>
-    
-    <script>
-        function openModal(filename) {{
-            const modal = document.getElementById('imageModal');
-            const modalImg = document.getElementById('modalImage');
-            const caption = document.getElementById('modalCaption');
-            
-            modal.style.display = 'block';
-            modalImg.src = '""" + CDN_CONFIG["base_url"] + """/' + filename;
-            caption.innerHTML = filename;
-        }}
-        
-        function closeModal() {{
-            document.getElementById('imageModal').style.display = 'none';
-        }}
-        
-        // Close modal when clicking outside the image
-        window.onclick = function(event) {{
-            const modal = document.getElementById('imageModal');
-            if (event.target === modal) {{
-                modal.style.display = 'none';
-            }}
-        }}
-        
-        // Close modal with Escape key
-        document.addEventListener('keydown', function(event) {{
-            if (event.key === 'Escape') {{
-                closeModal();
-            }}
-        }});
-    </script>
 </body>
 </html>"""
     
-    return html
+
+def precompress(output_file):
+    """Write a .gz copy next to a generated file, for hosts that serve precompressed assets"""
+    if not EMIT_GZIP:
+        return
+    output_file = os.fspath(output_file)
+    with open(output_file, 'rb') as f:
+        data = f.read()
+    with open(output_file + '.gz', 'wb') as f:
+        # mtime=0 keeps the .gz byte-identical across rebuilds of an unchanged page
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+def write_static_assets():
+    """Write the stylesheets and script shared by every page"""
+    for name, text in (('css/main.css', MAIN_CSS), ('css/layout.css', DETAIL_CSS), ('js/app.js', APP_JS)):
+        asset = OUTPUT_DIR / name
+        asset.parent.mkdir(exist_ok=True)
+        asset.write_bytes(text.encode('utf-8'))
+        precompress(asset)
+
+def _render_and_write(task):
+    """Render one cluster detail page and write it to disk (runs in a worker process)"""
+    cluster_id, screenshots, output_file = task
+    with open(output_file, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE) as f:
+        f.writelines(generate_cluster_detail_page(cluster_id, screenshots))
+    precompress(output_file)
+    return output_file
+
+# Salt for page hashes, so edits to the templates or CDN settings in this file invalidate every cached page
+_SOURCE_HASH = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16).digest()
+
+def cluster_page_hash(cluster_id, screenshots):
+    """Hash the inputs a cluster detail page is rendered from"""
+    h = hashlib.blake2b(_SOURCE_HASH, digest_size=16)
+    h.update(repr((cluster_id, screenshots)).encode('utf-8'))
+    return h.hexdigest()
+
+def load_page_cache():
+    """Load the {cluster_id: page_hash} cache from the previous run"""
+    try:
+        return json.loads((CACHE_DIR / 'optimized_pages.json').read_bytes())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Warning: ignoring unreadable page cache: {e}")
+        return {}
+
+def save_page_cache(cache):
+    """Store the {cluster_id: page_hash} cache for the next run"""
+    # Write a temp file and swap it in, so an interrupted run never leaves a truncated cache
+    CACHE_DIR.mkdir(exist_ok=True)
+    cache_file = CACHE_DIR / 'optimized_pages.json'
+    tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+    tmp_file.write_bytes(json.dumps(cache).encode('utf-8'))
+    os.replace(tmp_file, cache_file)
 
 def get_cluster_summary(clusters):
     """Get summary statistics for clusters"""
     total_clusters = len(clusters)
-    total_screenshots = sum(len(screenshots) for screenshots in clusters.values())
+    sizes = {cluster_id: len(screenshots) for cluster_id, screenshots in clusters.items()}
+    total_screenshots = sum(sizes.values())
     
     return {
         'total_clusters': total_clusters,
-        'total_screenshots': total_screenshots
+        'total_screenshots': total_screenshots,
+        # Largest first; shared by the index page and the detail-page loop
+        'sorted_cluster_ids': sorted(sizes, key=sizes.__getitem__, reverse=True)
     }
 
 def copy_images():
@@ -544,23 +601,42 @@ def main():
     
     # Create output directory
     OUTPUT_DIR.mkdir(exist_ok=True)
+    write_static_assets()
     
     # Generate summary
     summary = get_cluster_summary(clusters)
     
     # Generate main page
     print("Generating main page...")
-    main_html = generate_main_page(clusters, summary)
-    with open(OUTPUT_DIR / "index.html", "w") as f:
-        f.write(main_html)
+    # Stream the page through a large buffer, always UTF-8 regardless of the platform's default encoding
+    with open(OUTPUT_DIR / "index.html", 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE) as f:
+        f.writelines(generate_main_page(clusters, summary))
+    precompress(OUTPUT_DIR / "index.html")
     
     # Generate cluster detail pages
     print("Generating cluster detail pages...")
-    sorted_clusters = sorted(clusters.items(), key=lambda x: len(x[1]), reverse=True)
-    for cluster_id, screenshots in sorted_clusters:
-        detail_html = generate_cluster_detail_page(cluster_id, screenshots)
-        with open(OUTPUT_DIR / f"layout_{cluster_id}.html", "w") as f:
-            f.write(detail_html)
+    # Skip pages whose inputs are unchanged since the last run
+    cache = load_page_cache()
+    new_cache = {}
+    tasks = []
+    # Per-page paths are built as plain strings rather than Path objects
+    page_prefix = os.path.join(os.fspath(OUTPUT_DIR), 'layout_')
+    for cluster_id in summary['sorted_cluster_ids']:
+        screenshots = clusters[cluster_id]
+        output_file = f"{page_prefix}{cluster_id}.html"
+        new_cache[cluster_id] = page_hash = cluster_page_hash(cluster_id, screenshots)
+        # A page built with EMIT_GZIP=0 has no .gz yet, so re-render it once gzip is back on
+        if (cache.get(cluster_id) == page_hash and os.path.exists(output_file)
+                and (not EMIT_GZIP or os.path.exists(output_file + '.gz'))):
+            continue
+        tasks.append((cluster_id, screenshots, output_file))
+    
+    # Pages are independent and CPU-bound, so render them in worker processes
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for _ in executor.map(_render_and_write, tasks, chunksize=16):
+            pass
+    print(f"Unchanged: {len(clusters) - len(tasks)} detail pages")
+    save_page_cache(new_cache)
     
     # Copy images
     copy_images()
@@ -4,14 +4,14 @@ Integrate Authentication into Static Site Generator
 This script modifies your existing generator to add authentication
 """
 
+import mmap
+import os
 import re
+import shutil
 from pathlib import Path
 
-def add_auth_to_html_template(html_content):
-    """Add authentication elements to HTML template"""
-    
-    # Add authentication styles
-    auth_styles = """
+# Authentication styles, inserted before the closing </style> tag
+AUTH_STYLES = """
         /* Authentication Styles */
         .auth-loading-overlay {
             position: fixed;
@@ -73,40 +73,56 @@ def add_auth_to_html_template(html_content):
             border-color: rgba(255, 255, 255, 0.5);
         }
     """
-    
-    # Add styles before closing </style> tag
-    if '</style>' in html_content:
-        html_content = html_content.replace('</style>', f'{auth_styles}\n    </style>')
-    
-    # Add protected-content class to container
-    if 'class="container"' in html_content:
-        html_content = html_content.replace('class="container"', 'class="container protected-content"')
-    
-    # Add authentication notice to header
-    auth_notice = """
+
+# Authentication notice, appended to the header
+AUTH_NOTICE = """
         <p style="font-size: 0.9rem; opacity: 0.8; margin-top: 0.5rem;">
             🔐 <strong>Protected Content:</strong> You are authenticated and can view all layouts.
         </p>
     """
-    
-    # Find header and add notice
-    header_pattern = r'(<div class="header">.*?<p>.*?</p>)'
-    if re.search(header_pattern, html_content, re.DOTALL):
-        html_content = re.sub(
-            header_pattern, 
-            r'\1' + auth_notice, 
-            html_content, 
-            flags=re.DOTALL
-        )
-    
-    # Add authentication script before </body>
-    auth_script = """
+
+# Authentication script, inserted before </body>
+AUTH_SCRIPT = """
     <!-- Authentication Scripts -->
     <script type="module" src="./auth_middleware.js"></script>
     """
+
+AUTH_REPLACEMENTS = {
+    '</style>': AUTH_STYLES + '\n    </style>',
+    'class="container"': 'class="container protected-content"',
+    '</body>': AUTH_SCRIPT + '\n</body>',
+}
+
+# Built from the replacement keys so the two can't drift apart
+AUTH_ANCHOR_RE = re.compile('|'.join(re.escape(anchor) for anchor in AUTH_REPLACEMENTS))
+
+def add_auth_to_html_template(html_content):
+    """Add authentication elements to HTML template"""
     
-    if '</body>' in html_content:
-        html_content = html_content.replace('</body>', f'{auth_script}\n</body>')
+    # Styles before </style>, protected-content class on the container and
+    # the script before </body>, all in one scan
+    html_content = AUTH_ANCHOR_RE.sub(lambda m: AUTH_REPLACEMENTS[m.group(0)], html_content)
+    
+    # Find header and add notice after its first <p>...</p>
+    parts = []
+    pos = 0
+    while True:
+        start = html_content.find('<div class="header">', pos)
+        if start == -1:
+            break
+        p_start = html_content.find('<p>', start + len('<div class="header">'))
+        if p_start == -1:
+            break
+        end = html_content.find('</p>', p_start + len('<p>'))
+        if end == -1:
+            break
+        end += len('</p>')
+        parts.append(html_content[pos:end])
+        parts.append(AUTH_NOTICE)
+        pos = end
+    if parts:
+        parts.append(html_content[pos:])
+        html_content = ''.join(parts)
     
     return html_content
 
@@ -122,17 +138,25 @@ def modify_generator_file():
     print(f"📝 Modifying {generator_file}...")
     
     try:
-        with open(generator_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Probe the mapped bytes first so a generator without the function
+        # is never decoded
+        with open(generator_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                content = None
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(b'def generate_main_page(') == -1:
+                        content = None
+                    else:
+                        content = mm[:].decode('utf-8')
         
         # Find the generate_main_page function and modify it
-        if 'def generate_main_page(' in content:
+        if content is not None:
             # Add authentication to the HTML template
             content = add_auth_to_html_template(content)
             
             # Write back to file
-            with open(generator_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            Path(generator_file).write_text(content, encoding='utf-8')
             
             print("✅ Successfully modified generator file")
             return True
@@ -156,16 +180,13 @@ def copy_auth_files_to_docs():
         source_path = Path(auth_file)
         dest_path = docs_dir / auth_file
         
-        if source_path.exists():
-            with open(source_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            with open(dest_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            print(f"✅ Copied {auth_file} to docs directory")
-        else:
+        try:
+            shutil.copyfile(source_path, dest_path)
+        except FileNotFoundError:
             print(f"⚠️  Source file {auth_file} not found")
+            continue
+        
+        print(f"✅ Copied {auth_file} to docs directory")
 
 def main():
     """Main integration function"""
@@ -4,6 +4,7 @@ Remove auth_middleware.js script from all HTML files to eliminate conflicts
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def remove_auth_middleware(html_content):
@@ -17,6 +18,29 @@ def remove_auth_middleware(html_content):
     
     return html_content, False
 
+def process_html_file(html_file):
+    """Strip auth_middleware.js from one HTML file; returns True if it was rewritten"""
+    try:
+        with open(html_file.path, 'rb') as f:
+            data = f.read()
+        
+        # Probe the raw bytes first; files without the script are never decoded
+        if b'auth_middleware.js' not in data:
+            return False
+        
+        # Remove auth_middleware.js
+        new_content, was_modified = remove_auth_middleware(data.decode('utf-8'))
+        
+        if was_modified:
+            with open(html_file.path, 'wb') as f:
+                f.write(new_content.encode('utf-8'))
+            print(f"✅ Removed auth_middleware.js from {html_file.name}")
+        return was_modified
+        
+    except Exception as e:
+        print(f"❌ Error processing {html_file.name}: {e}")
+        return False
+
 def process_html_files():
     """Process all HTML files in the docs directory"""
     
@@ -25,27 +49,14 @@ def process_html_files():
         print("❌ docs directory not found")
         return
     
-    html_files = list(docs_dir.glob('*.html'))
+    # Plain suffix match over one directory read, no glob machinery or Path per entry
+    with os.scandir(docs_dir) as entries:
+        html_files = [entry for entry in entries if entry.name.endswith('.html') and entry.is_file()]
     print(f"🔍 Found {len(html_files)} HTML files to process")
     
-    modified_count = 0
-    
-    for html_file in html_files:
-        try:
-            with open(html_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Remove auth_middleware.js
-            new_content, was_modified = remove_auth_middleware(content)
-            
-            if was_modified:
-                with open(html_file, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-                modified_count += 1
-                print(f"✅ Removed auth_middleware.js from {html_file.name}")
-            
-        except Exception as e:
-            print(f"❌ Error processing {html_file.name}: {e}")
+    # Each file is an independent read-modify-write bound by disk latency, so overlap them in threads
+    with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 4) as executor:
+        modified_count = sum(executor.map(process_html_file, html_files))
     
     print(f"\n🎉 Completed! Modified {modified_count} files")
 
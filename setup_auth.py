@@ -6,10 +6,16 @@ Helps set up and verify the Firebase authentication system
 
 import os
 import json
+import re
 import subprocess
 import sys
 from pathlib import Path
 
+# Remembers the auth.js mtime and size that last passed the checks
+CHECK_CACHE_FILE = ".setup_auth.cache"
+
+FIREBASE_CONFIG_RE = re.compile(r'const firebaseConfig\s*=\s*\{.*?\};', re.DOTALL)
+
 def print_header(title):
     """Print a formatted header"""
     print("\n" + "="*60)
@@ -21,60 +27,51 @@ def print_step(step, description):
     print(f"\n{step}. {description}")
     print("-" * 40)
 
-def check_file_exists(filepath):
-    """Check if a file exists and return status"""
-    path = Path(filepath)
-    if path.exists():
-        return True, path.stat().st_size
-    return False, 0
+def load_check_cache():
+    """Load the auth.js key recorded by the last successful check, if any"""
+    try:
+        return json.loads(Path(CHECK_CACHE_FILE).read_text(encoding="utf-8")).get("key")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def save_check_cache(cache_key):
+    """Record that auth.js passed its checks at this mtime and size"""
+    try:
+        Path(CHECK_CACHE_FILE).write_text(json.dumps({"key": cache_key}), encoding="utf-8")
+    except OSError as e:
+        print(f"⚠️  Could not save check cache: {e}")
 
-def verify_firebase_config():
+def verify_firebase_config(content):
     """Verify Firebase configuration in auth.js"""
     print_step("1", "Verifying Firebase Configuration")
     
-    if not check_file_exists("auth.js")[0]:
-        print("❌ auth.js not found!")
-        return False
+    # Check for required Firebase config
+    required_keys = [
+        "apiKey",
+        "authDomain", 
+        "projectId",
+        "storageBucket",
+        "messagingSenderId",
+        "appId",
+        "measurementId"
+    ]
     
-    try:
-        with open("auth.js", "r") as f:
-            content = f.read()
-        
-        # Check for required Firebase config
-        required_keys = [
-            "apiKey",
-            "authDomain", 
-            "projectId",
-            "storageBucket",
-            "messagingSenderId",
-            "appId",
-            "measurementId"
-        ]
+    missing_keys = [key for key in required_keys if key not in content]
+    for key in missing_keys:
+        print(f"❌ Missing Firebase config key: {key}")
+    
+    if not missing_keys:
+        print("✅ Firebase configuration found in auth.js")
         
-        config_found = True
-        for key in required_keys:
-            if key not in content:
-                print(f"❌ Missing Firebase config key: {key}")
-                config_found = False
+        # Extract and display config
+        match = FIREBASE_CONFIG_RE.search(content)
+        if match:
+            print("\n📋 Firebase Configuration:")
+            print(match.group(0))
         
-        if config_found:
-            print("✅ Firebase configuration found in auth.js")
-            
-            # Extract and display config
-            start = content.find("const firebaseConfig = {")
-            if start != -1:
-                end = content.find("};", start) + 2
-                config_section = content[start:end]
-                print("\n📋 Firebase Configuration:")
-                print(config_section)
-            
-            return True
-        else:
-            print("❌ Firebase configuration incomplete")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error reading auth.js: {e}")
+        return True
+    else:
+        print("❌ Firebase configuration incomplete")
         return False
 
 def check_required_files():
@@ -92,9 +89,13 @@ def check_required_files():
     all_files_exist = True
     total_size = 0
     
+    # One directory listing instead of probing each file; only the files
+    # that are present get stat'ed for their size
+    present = set(os.listdir('.'))
+    
     for file in required_files:
-        exists, size = check_file_exists(file)
-        if exists:
+        if file in present:
+            size = os.stat(file).st_size
             print(f"✅ {file} ({size:,} bytes)")
             total_size += size
         else:
@@ -108,43 +109,34 @@ def check_required_files():
         print("\n❌ Some required files are missing")
         return False
 
-def check_firebase_dependencies():
+def check_firebase_dependencies(content):
     """Check if Firebase dependencies are properly configured"""
     print_step("3", "Checking Firebase Dependencies")
     
-    try:
-        with open("auth.js", "r") as f:
-            content = f.read()
-        
-        # Check for Firebase SDK imports
-        firebase_imports = [
-            "firebase/app",
-            "firebase/auth", 
-            "firebase/analytics"
-        ]
-        
-        all_imports_found = True
-        for import_path in firebase_imports:
-            if import_path in content:
-                print(f"✅ Firebase import found: {import_path}")
-            else:
-                print(f"❌ Firebase import missing: {import_path}")
-                all_imports_found = False
-        
-        # Check for auth providers
-        providers = ["GoogleAuthProvider", "OAuthProvider"]
-        for provider in providers:
-            if provider in content:
-                print(f"✅ Auth provider found: {provider}")
-            else:
-                print(f"❌ Auth provider missing: {provider}")
-                all_imports_found = False
-        
-        return all_imports_found
-        
-    except Exception as e:
-        print(f"❌ Error checking dependencies: {e}")
-        return False
+    # Check for Firebase SDK imports
+    firebase_imports = [
+        "firebase/app",
+        "firebase/auth", 
+        "firebase/analytics"
+    ]
+    
+    missing_imports = [path for path in firebase_imports if path not in content]
+    for import_path in firebase_imports:
+        if import_path in missing_imports:
+            print(f"❌ Firebase import missing: {import_path}")
+        else:
+            print(f"✅ Firebase import found: {import_path}")
+    
+    # Check for auth providers
+    providers = ["GoogleAuthProvider", "OAuthProvider"]
+    missing_providers = [provider for provider in providers if provider not in content]
+    for provider in providers:
+        if provider in missing_providers:
+            print(f"❌ Auth provider missing: {provider}")
+        else:
+            print(f"✅ Auth provider found: {provider}")
+    
+    return not missing_imports and not missing_providers
 
 def generate_firebase_setup_guide():
     """Generate Firebase setup instructions"""
@@ -188,8 +180,7 @@ def generate_firebase_setup_guide():
     print(setup_guide)
     
     # Save setup guide to file
-    with open("FIREBASE_SETUP_GUIDE.txt", "w") as f:
-        f.write(setup_guide)
+    Path("FIREBASE_SETUP_GUIDE.txt").write_text(setup_guide, encoding="utf-8")
     
     print("📝 Setup guide saved to FIREBASE_SETUP_GUIDE.txt")
 
@@ -212,6 +203,11 @@ def test_local_server():
     print("   - Test Google/Microsoft sign-in")
     print("   - Verify redirects work correctly")
 
+def report_config_issues():
+    """Print the summary shown when the Firebase configuration check fails"""
+    print("\n❌ Firebase configuration issues found!")
+    print("Please check your auth.js file.")
+
 def main():
     """Main setup function"""
     print_header("Festival Crawler Authentication Setup")
@@ -222,11 +218,33 @@ def main():
     current_dir = Path.cwd()
     print(f"\n📁 Current directory: {current_dir}")
     
-    # Verify Firebase configuration
-    if not verify_firebase_config():
-        print("\n❌ Firebase configuration issues found!")
-        print("Please check your auth.js file.")
+    # Skip the auth.js checks if it hasn't changed since they last passed
+    try:
+        auth_stat = os.stat("auth.js")
+    except FileNotFoundError:
+        print_step("1", "Verifying Firebase Configuration")
+        print("❌ auth.js not found!")
+        report_config_issues()
         return False
+    cache_key = [auth_stat.st_mtime_ns, auth_stat.st_size]
+    auth_js_verified = load_check_cache() == cache_key
+    
+    if auth_js_verified:
+        print("\n✅ auth.js unchanged since last successful verification - skipping config checks")
+    else:
+        # Read auth.js once and share it between the checks
+        try:
+            auth_js = Path("auth.js").read_text(encoding="utf-8")
+        except Exception as e:
+            print_step("1", "Verifying Firebase Configuration")
+            print(f"❌ Error reading auth.js: {e}")
+            report_config_issues()
+            return False
+        
+        # Verify Firebase configuration
+        if not verify_firebase_config(auth_js):
+            report_config_issues()
+            return False
     
     # Check required files
     if not check_required_files():
@@ -234,11 +252,14 @@ def main():
         print("Please ensure all authentication files are present.")
         return False
     
-    # Check dependencies
-    if not check_firebase_dependencies():
-        print("\n❌ Firebase dependencies issues found!")
-        print("Please check your auth.js file.")
-        return False
+    if not auth_js_verified:
+        # Check dependencies
+        if not check_firebase_dependencies(auth_js):
+            print("\n❌ Firebase dependencies issues found!")
+            print("Please check your auth.js file.")
+            return False
+        
+        save_check_cache(cache_key)
     
     # Generate setup guide
     generate_firebase_setup_guide()
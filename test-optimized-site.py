@@ -3,10 +3,14 @@
 Test script for the optimized static site generator
 """
 
+import importlib.util
 import os
 import sys
 from pathlib import Path
 
+# Whether we're running inside a virtual environment
+IN_VENV = hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix)
+
 def test_dependencies():
     """Test if all required dependencies are available"""
     print("🔍 Testing dependencies...")
@@ -28,7 +32,7 @@ def test_dependencies():
             return False
     
     # Check if we're in virtual environment
-    if hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix):
+    if IN_VENV:
         print("✅ Virtual environment detected")
     else:
         print("⚠️  Not in virtual environment - some dependencies may be missing")
@@ -36,18 +40,33 @@ def test_dependencies():
     print("✅ All dependencies available")
     return True
 
+def load_generator_module():
+    """Load generate_static_site_optimized.py, reusing it if already imported"""
+    module_name = "generate_static_site_optimized"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    
+    # Load by file path rather than appending '.' to sys.path
+    spec = importlib.util.spec_from_file_location(module_name, f"{module_name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[module_name]
+        raise
+    return module
+
 def test_generator():
     """Test the static site generator"""
     print("\n🔧 Testing static site generator...")
     
     try:
         # Import the generator module
-        sys.path.append('.')
-        from generate_static_site_optimized import (
-            load_cluster_data, 
-            get_cluster_summary,
-            create_thumbnail_url
-        )
+        generator = load_generator_module()
+        load_cluster_data = generator.load_cluster_data
+        get_cluster_summary = generator.get_cluster_summary
+        create_thumbnail_url = generator.create_thumbnail_url
         
         # Test data loading
         clusters = load_cluster_data()
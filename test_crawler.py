@@ -13,6 +13,9 @@ sys.path.append(str(Path(__file__).parent))
 
 from festival_crawler import FestivalCrawler
 
+# Whether we're running inside a virtual environment
+IN_VENV = hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix)
+
 
 async def test_crawler():
     """Test the crawler with minimal settings"""
@@ -28,7 +31,7 @@ async def test_crawler():
         print("✅ Starting test crawl (depth 1, homepage only)...")
         
         # Run with minimal depth for testing
-        await test_crawler.run(max_depth=2, delay=2.0)
+        await test_crawler.run(max_depth=0, delay=0.5)
         
         print("✅ Test crawl completed successfully!")
         print(f"📁 Screenshots saved to: {test_crawler.output_dir}")
@@ -53,7 +56,7 @@ if __name__ == "__main__":
     print("=" * 40)
     
     # Check if virtual environment is activated
-    if not hasattr(sys, 'real_prefix') and not (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix):
+    if not IN_VENV:
         print("⚠️  Warning: Virtual environment may not be activated")
         print("   Run: source .venv/bin/activate")
         print()
@@ -3,52 +3,92 @@
 Test script to verify deployment is working correctly
 """
 
-import os
+import threading
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 
-def test_deployment(base_url):
-    """Test the deployment endpoints"""
-    print(f"Testing deployment at: {base_url}")
-    
-    # Test main page
+def check_main_page(session, base_url):
+    """Test the main page, returning the report lines"""
+    lines = []
     try:
-        response = requests.get(f"{base_url}/")
-        print(f"Main page: {response.status_code}")
+        response = session.get(f"{base_url}/", timeout=10)
+        lines.append(f"Main page: {response.status_code}")
         if response.status_code == 200:
-            print("✅ Main page loads successfully")
+            lines.append("✅ Main page loads successfully")
         else:
-            print("❌ Main page failed to load")
+            lines.append("❌ Main page failed to load")
     except Exception as e:
-        print(f"❌ Error accessing main page: {e}")
-    
-    # Test debug endpoint
+        lines.append(f"❌ Error accessing main page: {e}")
+    return lines
+
+def check_debug_endpoint(session, base_url):
+    """Test the debug endpoint, returning the report lines"""
+    lines = []
     try:
-        response = requests.get(f"{base_url}/debug")
-        print(f"Debug endpoint: {response.status_code}")
+        response = session.get(f"{base_url}/debug", timeout=10)
+        lines.append(f"Debug endpoint: {response.status_code}")
         if response.status_code == 200:
             debug_info = response.json()
-            print("✅ Debug endpoint working")
-            print(f"Working directory: {debug_info.get('working_directory')}")
-            print(f"folklife-screens-x exists: {debug_info.get('folklife_screens_x_exists')}")
-            print(f"Available directories: {debug_info.get('available_directories')}")
+            lines.append("✅ Debug endpoint working")
+            lines.append(f"Working directory: {debug_info.get('working_directory')}")
+            lines.append(f"folklife-screens-x exists: {debug_info.get('folklife_screens_x_exists')}")
+            lines.append(f"Available directories: {debug_info.get('available_directories')}")
         else:
-            print("❌ Debug endpoint failed")
+            lines.append("❌ Debug endpoint failed")
     except Exception as e:
-        print(f"❌ Error accessing debug endpoint: {e}")
-    
-    # Test image serving
+        lines.append(f"❌ Error accessing debug endpoint: {e}")
+    return lines
+
+def check_image_serving(session, base_url):
+    """Test image serving, returning the report lines"""
+    lines = []
     try:
         # Try to load a sample image
-        response = requests.get(f"{base_url}/images/homepage.png")
-        print(f"Image test: {response.status_code}")
-        if response.status_code == 200:
-            print("✅ Image serving working")
-            print(f"Image size: {len(response.content)} bytes")
-        else:
-            print("❌ Image serving failed")
+        with session.get(f"{base_url}/images/homepage.png", stream=True, timeout=10) as response:
+            lines.append(f"Image test: {response.status_code}")
+            if response.status_code == 200:
+                lines.append("✅ Image serving working")
+                # Only the size is reported, so avoid buffering the body
+                size = response.headers.get('Content-Length')
+                if size is None:
+                    size = sum(len(chunk) for chunk in response.iter_content(chunk_size=65536))
+                lines.append(f"Image size: {size} bytes")
+            else:
+                lines.append("❌ Image serving failed")
     except Exception as e:
-        print(f"❌ Error testing image serving: {e}")
+        lines.append(f"❌ Error testing image serving: {e}")
+    return lines
+
+def test_deployment(base_url):
+    """Test the deployment endpoints"""
+    print(f"Testing deployment at: {base_url}")
+
+    probes = [check_main_page, check_debug_endpoint, check_image_serving]
+
+    # A requests.Session isn't thread-safe, so each worker thread gets its own,
+    # but they all mount one adapter whose urllib3 pool is; connections are
+    # pooled and reused across every worker
+    adapter = HTTPAdapter(pool_maxsize=len(probes))
+    worker = threading.local()
+
+    def run_probe(probe):
+        """Run a probe on the calling worker thread's session"""
+        if not hasattr(worker, 'session'):
+            worker.session = requests.Session()
+            worker.session.mount('http://', adapter)
+            worker.session.mount('https://', adapter)
+        return probe(worker.session, base_url)
+
+    # Run the probes concurrently, then print the reports in order so the
+    # output doesn't interleave
+    try:
+        with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+            for lines in executor.map(run_probe, probes):
+                for line in lines:
+                    print(line)
+    finally:
+        adapter.close()
 
 if __name__ == "__main__":
     import sys